@@ -0,0 +1,239 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from graphs.render import set_headless
+
+
+def first_node(graph, source):
+    if source is not None:
+        return source
+    return next(iter(graph.nodes), None)
+
+
+def read_graph(instance):
+    if isinstance(instance, str):
+        from graphs.createGraph import create_graph
+        return create_graph(instance)[0]
+    return instance
+
+
+def read_tasks(instance, parse_data):
+    return parse_data(instance) if isinstance(instance, str) else instance
+
+
+def solve_vertex_cover(instance, options):
+    from vertex_cover.main import vertex_cover
+    cover = vertex_cover(read_graph(instance), options["randomized"], options["seed"])
+    return {"size": len(cover), "cover": cover}
+
+
+def solve_postman(instance, options):
+    from chinese_postman.main import chinese_postman
+    graph = read_graph(instance)
+    weight, path = chinese_postman(graph, first_node(graph, options["source"]), options["matching"])
+    return {"weight": weight, "path": path}
+
+
+def solve_christofides(instance, options):
+    from christofides.main import christofides
+    graph = read_graph(instance)
+    weight, path = christofides(graph, first_node(graph, options["source"]), options["metric_check"],
+                                options["matching"], options["improve"], options["time_limit"])
+    return {"weight": weight, "path": path}
+
+
+def solve_hu(instance, options):
+    from hu.main import parse_data, run_hu, tasks_from_csr
+    tasks = read_tasks(instance, parse_data)
+    if not isinstance(tasks, list):
+        tasks = tasks_from_csr(tasks)
+    graph_type, diagram, mirror, super_root = run_hu(tasks, options["machines"])
+    if graph_type == "invalid":
+        raise ValueError("Input graph must be an in-tree, out-tree, in-forest, or out-forest")
+    steps = [[task for task in step if task != super_root] for step in diagram]
+    if mirror:
+        steps.reverse()
+    steps = [step for step in steps if step]
+    return {"type": graph_type, "makespan": len(steps), "schedule": steps}
+
+
+def solve_list_scheduling(instance, options):
+    from hu.main import parse_data
+    from hu.list_scheduling import schedule_tasks
+    diagram, priorities = schedule_tasks(read_tasks(instance, parse_data), options["machines"], options["rule"])
+    return {"rule": options["rule"], "makespan": len(diagram), "schedule": diagram}
+
+
+def solve_critical_path(instance, options):
+    from critical_path.main import parse_data
+    from critical_path.engine import TaskNetwork, network_properties
+    earliest, latest, critical_path, duration = network_properties(TaskNetwork(read_tasks(instance, parse_data)))
+    return {"duration": duration, "critical_path": critical_path, "earliest_start": earliest, "latest_start": latest}
+
+
+TASK_ALGORITHMS = ("hu", "list_scheduling", "critical_path")
+
+DEFAULT_OPTIONS = {
+    "source": None,
+    "machines": 2,
+    "rule": "hlf",
+    "matching": "exact",
+    "improve": False,
+    "metric_check": True,
+    "time_limit": 1.0,
+    "randomized": False,
+    "seed": None,
+    "verbose": False,
+}
+
+SOLVERS = {
+    "vertex_cover": solve_vertex_cover,
+    "postman": solve_postman,
+    "christofides": solve_christofides,
+    "hu": solve_hu,
+    "list_scheduling": solve_list_scheduling,
+    "critical_path": solve_critical_path,
+}
+
+
+def pack_instance(algo, instance):
+    # ścieżki, grafy CSR i współrzędne przechodzą bez zmian, resztę zamieniamy na tablice CSR zamiast pickle'owania słowników
+    from graphs.coordinateGraph import CoordinateGraph
+    from graphs.csrGraph import CSRGraph, from_graph, task_graph
+    if isinstance(instance, (str, CSRGraph, CoordinateGraph)):
+        return instance
+    if algo in TASK_ALGORITHMS:
+        return task_graph(instance)
+    return from_graph(instance)
+
+
+def solve_one(algo, options, item):
+    index, instance = item
+    record = {"index": index, "algo": algo}
+    if isinstance(instance, str):
+        record["input"] = instance
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        if isinstance(instance, Exception):
+            raise instance
+        with contextlib.redirect_stdout(log):
+            record["result"] = SOLVERS[algo](instance, options)
+        record["ok"] = True
+    except Exception as error:
+        record["ok"] = False
+        record["error"] = f"{type(error).__name__}: {error}"
+    record["time"] = time.perf_counter() - start
+    if options["verbose"]:
+        record["log"] = log.getvalue()
+    return record
+
+
+def packed_instances(algo, instances):
+    for index, instance in enumerate(instances):
+        try:
+            yield index, pack_instance(algo, instance)
+        except Exception as error:
+            yield index, error
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        # ścieżka bez dopasowań trafia dalej i kończy się błędem dla tej instancji
+        paths.extend(matches or [pattern])
+    return paths
+
+
+def to_builtin(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def format_record(record, output_format):
+    if output_format == "json":
+        return json.dumps(record, default=to_builtin)
+    status = "ok" if record["ok"] else f"error: {record['error']}"
+    summary = ""
+    if record["ok"]:
+        result = record["result"]
+        summary = " ".join(f"{key}={result[key]}" for key in ("weight", "size", "makespan", "duration") if key in result)
+    return f"{record.get('input', '#' + str(record['index']))}\t{record['algo']}\t{record['time']:.3f}s\t{status}\t{summary}".rstrip()
+
+
+def run(algo, instances, options, workers=None):
+    if algo not in SOLVERS:
+        raise ValueError(f"Unknown algorithm: {algo}")
+    options = {**DEFAULT_OPTIONS, **options}
+    if algo == "christofides" and options["matching"] not in ("exact", "greedy"):
+        raise ValueError(f"Unsupported matching mode for christofides: {options['matching']}")
+    instances = list(instances)
+    set_headless(True)
+    solve = partial(solve_one, algo, options)
+    if workers == 1 or len(instances) <= 1:
+        yield from map(solve, packed_instances(algo, instances))
+        return
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(instances) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_headless, initargs=(True,)) as executor:
+        yield from executor.map(solve, packed_instances(algo, instances), chunksize=chunksize)
+
+
+def solve_batch(algo, instances, workers=None, **options):
+    return list(run(algo, instances, options, workers))
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m batch", description="Run solvers headless over many input files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    solve = commands.add_parser("solve", help="solve every input file with one algorithm")
+    solve.add_argument("--algo", required=True, choices=sorted(SOLVERS))
+    solve.add_argument("--input", required=True, nargs="+", help="input files or glob patterns")
+    solve.add_argument("--source", help="start node for postman/christofides (default: first node)")
+    solve.add_argument("--machines", type=int, default=2, help="number of machines for hu/list_scheduling")
+    solve.add_argument("--rule", default="hlf", choices=("coffman-graham", "hlf", "critical-path"))
+    solve.add_argument("--matching", default="exact", choices=("exact", "knn", "greedy"))
+    solve.add_argument("--improve", action="store_true", help="run 2-opt/Or-opt after christofides")
+    solve.add_argument("--no-metric-check", dest="metric_check", action="store_false",
+                       help="skip the O(n^3) triangle inequality check in christofides")
+    solve.add_argument("--time-limit", type=float, default=1.0)
+    solve.add_argument("--randomized", action="store_true", help="shuffle edges in vertex_cover")
+    solve.add_argument("--seed", type=int)
+    solve.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    solve.add_argument("--format", default="json", choices=("json", "text"))
+    solve.add_argument("--output", help="write results to this file instead of stdout")
+    solve.add_argument("--verbose", action="store_true", help="include solver output in each record")
+    args = parser.parse_args(argv)
+    if args.algo == "christofides" and args.matching == "knn":
+        solve.error("--matching knn is only supported by postman")
+    return args
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    options = {key: getattr(args, key) for key in DEFAULT_OPTIONS}
+    paths = expand_inputs(args.input)
+    output = open(args.output, "w") if args.output else sys.stdout
+    failed = 0
+    try:
+        for record in run(args.algo, paths, options, args.workers):
+            failed += not record["ok"]
+            print(format_record(record, args.format), file=output, flush=True)
+    finally:
+        if args.output:
+            output.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["matplotlib", "networkx", "prettytable"]
+
+CASES = {
+    "eager baseline": "import matplotlib.pyplot, networkx, prettytable",
+    "graphs": "import graphs.createGraph, graphs.graph, graphs.directedGraph",
+    "vertex cover solve": (
+        "from graphs.graph import Graph\n"
+        "from vertex_cover.main import vertex_cover\n"
+        "g = Graph()\n"
+        "[g.add_node(i) for i in range(4)]\n"
+        "g.add_edge(0, 1)\n"
+        "g.add_edge(2, 3)\n"
+        "vertex_cover(g)"
+    ),
+    "critical path import": "import critical_path.main",
+    "hu import": "import hu.main",
+}
+
+
+def measure(code, repeat):
+    probe = code + "\nimport sys\nprint('loaded:' + ','.join(m for m in %r if m in sys.modules))" % HEAVY
+    best = None
+    loaded = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True,
+            env=dict(os.environ, HEADLESS="1"), check=True
+        )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        loaded = result.stdout.rsplit("loaded:", 1)[-1].strip()
+    return best, loaded
+
+
+def main(repeat=5):
+    print(f"{'case':<22}{'best [ms]':>10}  heavy modules loaded")
+    for name, code in CASES.items():
+        best, loaded = measure(code, repeat)
+        print(f"{name:<22}{best * 1000:>10.1f}  {loaded or '-'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
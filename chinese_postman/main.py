@@ -1,37 +1,49 @@
-import matplotlib.pyplot as plt
 import networkx as nx
 import itertools as it
+import heapq
+import numpy as np
+from graphs.render import is_headless
+from graphs.matching import greedy_matching, matching_report
+from graphs.graph import Graph
+from graphs.directedGraph import DirectedGraph
+from graphs.csrGraph import CSRGraph, from_graph, to_networkx
 
 
-def chinese_postman(graph, source):
+def chinese_postman(graph, source, matching="exact", neighbours=10):
+    if isinstance(graph, Graph):
+        # Graph (typ N) nie ma wag: liczymy na tablicach CSR z wagami jednostkowymi
+        graph = from_graph(graph)
+    if isinstance(graph, CSRGraph) and graph.is_directed():
+        graph = to_networkx(graph)
+    if isinstance(graph, DirectedGraph) or not isinstance(graph, CSRGraph) and graph.is_directed():
+        graph = to_weighted_digraph(graph)
+        if all(oneway for _, _, oneway in graph.edges(data="oneway")):
+            return directed_chinese_postman(graph, source)
+        return mixed_chinese_postman(graph, source)
+
     plot_graphs(graph)
 
-    if not nx.is_eulerian(graph):
+    odd_nodes = odd_degree_nodes(graph)
+    if odd_nodes:
         print("Graph has odd degrees")
-        odd_nodes = nx.Graph()
-        for node in graph.nodes:
-            if graph.degree(node) % 2 != 0:
-                odd_nodes.add_node(node)
-        new = list(odd_nodes.nodes)
-        graph = nx.MultiGraph(graph)
-        for i in range(len(new)):
-            for j in range(i + 1, len(new)):
-                weight = 0
-                shortest_path = nx.shortest_path(graph, weight="weight", source=new[i], target=new[j])
-                for k in range(len(shortest_path) - 1):
-                    weight += graph[shortest_path[k]][shortest_path[k + 1]][0]["weight"]
-                odd_nodes.add_edge(new[i], new[j], weight=weight)
-        matching = nx.min_weight_matching(odd_nodes)
-        plot_graph(odd_nodes, matching)
-        for edge in matching:
-            shortest_path = nx.shortest_path(graph, weight="weight", source=edge[0], target=edge[1])
+        paths = odd_node_paths(graph, odd_nodes, None if matching == "exact" else neighbours)
+        matching_graph, matching, report = match_odd_nodes(graph, odd_nodes, paths, matching, neighbours)
+        print(f"Matching ({report['mode']}): cost {report['cost']}, lower bound {report['lower_bound']}, "
+              f"gap <= {report['gap']:.2%}")
+        plot_graph(matching_graph, matching)
+        graph = to_multigraph(graph)
+        for u, v in matching:
+            if v not in paths[u][0]:
+                u, v = v, u
+            shortest_path = expand_path(paths[u][1], u, v)
             for k in range(len(shortest_path) - 1):
-                weight = graph[shortest_path[k]][shortest_path[k + 1]][0]["weight"]
+                weight = min(data["weight"] for data in graph[shortest_path[k]][shortest_path[k + 1]].values())
                 graph.add_edge(shortest_path[k], shortest_path[k + 1], weight=weight)
         plot_graphs(graph)
 
     else:
         print("Graph has all even degrees")
+        graph = to_multigraph(graph)
     print("Finding Eulerian path")
     eulerian = list(nx.eulerian_circuit(graph))
 
@@ -49,7 +61,293 @@ def chinese_postman(graph, source):
     return weight, path
 
 
+def to_weighted_digraph(graph):
+    digraph = nx.MultiDiGraph()
+    if isinstance(graph, DirectedGraph):
+        digraph.add_nodes_from(graph.nodes)
+        for u in graph.nodes:
+            for v, count in graph.successors[u].items():
+                for _ in range(count):
+                    digraph.add_edge(u, v, weight=1, oneway=True)
+        return digraph
+    digraph.add_nodes_from(graph.nodes)
+    for u, v, data in graph.edges(data=True):
+        digraph.add_edge(u, v, weight=data["weight"], oneway=data.get("oneway", True))
+    return digraph
+
+
+def traversal_graph(graph):
+    traversal = nx.DiGraph()
+    traversal.add_nodes_from(graph.nodes)
+    for u, v, data in graph.edges(data=True):
+        arcs = [(u, v)] if data["oneway"] else [(u, v), (v, u)]
+        for a, b in arcs:
+            if not traversal.has_edge(a, b) or traversal[a][b]["weight"] > data["weight"]:
+                traversal.add_edge(a, b, weight=data["weight"])
+    return traversal
+
+
+def balance_arcs(arcs, traversal):
+    imbalance = {node: 0 for node in traversal.nodes}
+    for u, v, _ in arcs:
+        imbalance[u] += 1
+        imbalance[v] -= 1
+    if not any(imbalance.values()):
+        return []
+
+    flow_graph = traversal.copy()
+    nx.set_node_attributes(flow_graph, imbalance, "demand")
+    flow = nx.network_simplex(flow_graph)[1]
+    extra = []
+    for u, targets in flow.items():
+        for v, amount in targets.items():
+            extra.extend([(u, v, traversal[u][v]["weight"])] * amount)
+    return extra
+
+
+def orient_two_way_edges(graph):
+    arcs = []
+    two_way = {}
+    imbalance = {node: 0 for node in graph.nodes}
+    for u, v, data in graph.edges(data=True):
+        arcs.append([u, v, data["weight"]])
+        imbalance[u] += 1
+        imbalance[v] -= 1
+        if not data["oneway"]:
+            two_way.setdefault((u, v), []).append(len(arcs) - 1)
+
+    source, sink = ("source",), ("sink",)
+    flow_graph = nx.DiGraph()
+    for node, value in imbalance.items():
+        if value >= 2:
+            flow_graph.add_edge(source, node, capacity=value // 2, weight=0)
+        elif value <= -2:
+            flow_graph.add_edge(node, sink, capacity=-value // 2, weight=0)
+    if not flow_graph.has_node(source) or not flow_graph.has_node(sink):
+        return arcs
+    for (u, v), indices in two_way.items():
+        flow_graph.add_edge(u, v, capacity=len(indices), weight=1)
+
+    flow = nx.max_flow_min_cost(flow_graph, source, sink)
+    for (u, v), indices in two_way.items():
+        for index in indices[:flow[u][v]]:
+            arcs[index][0], arcs[index][1] = v, u
+    return arcs
+
+
+def euler_tour(arcs, source):
+    multigraph = nx.MultiDiGraph()
+    for u, v, weight in arcs:
+        multigraph.add_edge(u, v, weight=weight)
+    if source not in multigraph:
+        source = None
+    eulerian = list(nx.eulerian_circuit(multigraph, source=source, keys=True))
+    weight = sum(multigraph[u][v][key]["weight"] for u, v, key in eulerian)
+    path = " -> ".join([u for u, _, _ in eulerian] + [eulerian[-1][1]])
+    return weight, path
+
+
+def directed_chinese_postman(graph, source):
+    traversal = traversal_graph(graph)
+    if not nx.is_strongly_connected(traversal):
+        print("Graph is not strongly connected")
+        return None, "No path possible"
+
+    arcs = [(u, v, data["weight"]) for u, v, data in graph.edges(data=True)]
+    extra = balance_arcs(arcs, traversal)
+    print(f"Duplicated arcs: {len(extra)}")
+    print("Finding Eulerian path")
+    return euler_tour(arcs + extra, source)
+
+
+def mixed_chinese_postman(graph, source):
+    traversal = traversal_graph(graph)
+    if not nx.is_strongly_connected(traversal):
+        print("Graph is not strongly connected")
+        return None, "No path possible"
+
+    arcs = [tuple(arc) for arc in orient_two_way_edges(graph)]
+    extra = balance_arcs(arcs, traversal)
+    print(f"Duplicated arcs: {len(extra)}")
+    print("Finding Eulerian path")
+    return euler_tour(arcs + extra, source)
+
+
+def odd_degree_nodes(graph):
+    if isinstance(graph, CSRGraph):
+        nodes = graph.nodes
+        return [nodes[v] for v in np.flatnonzero(graph.degrees() % 2).tolist()]
+    return [node for node in graph.nodes if graph.degree(node) % 2 != 0]
+
+
+def to_multigraph(graph):
+    if not isinstance(graph, CSRGraph):
+        return nx.MultiGraph(graph)
+    nodes = graph.nodes
+    weights = [1] * graph.number_of_edges() if graph.weights is None else graph.weights.tolist()
+    multigraph = nx.MultiGraph()
+    multigraph.add_nodes_from(nodes)
+    multigraph.add_weighted_edges_from(
+        (nodes[u], nodes[v], weight) for u, v, weight in zip(graph.sources().tolist(), graph.indices.tolist(), weights)
+    )
+    return multigraph
+
+
+def adjacency_lists(graph):
+    # listy w układzie CSR z obiema orientacjami krawędzi; CSRGraph bez wag ma wagi jednostkowe
+    if isinstance(graph, CSRGraph):
+        undirected = graph.undirected()
+        weights = undirected.weights
+        weights = [1] * undirected.number_of_edges() if weights is None else weights.tolist()
+        return graph.nodes, graph.index, undirected.indptr.tolist(), undirected.indices.tolist(), weights
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    multigraph = graph.is_multigraph()
+    indptr, indices, weights = [0], [], []
+    for node in nodes:
+        for neighbour, data in graph.adj[node].items():
+            indices.append(index[neighbour])
+            weights.append(min(edge["weight"] for edge in data.values()) if multigraph else data["weight"])
+        indptr.append(len(indices))
+    return nodes, index, indptr, indices, weights
+
+
+def dijkstra(adjacency, source, targets=(), limit=None):
+    nodes, index, indptr, indices, weights = adjacency
+    source = index[source]
+    targets = {index[target] for target in targets}
+    distances = {}
+    predecessors = {source: None}
+    tentative = {source: 0}
+    heap = [(0, 0, source)]
+    counter = 1
+    found = 0
+    while heap:
+        distance, _, node = heapq.heappop(heap)
+        if node in distances:
+            continue
+        distances[node] = distance
+        if node != source and node in targets:
+            found += 1
+            if found == limit:
+                break
+        for k in range(indptr[node], indptr[node + 1]):
+            neighbour = indices[k]
+            if neighbour in distances:
+                continue
+            candidate = distance + weights[k]
+            if candidate < tentative.get(neighbour, float("inf")):
+                tentative[neighbour] = candidate
+                predecessors[neighbour] = node
+                heapq.heappush(heap, (candidate, counter, neighbour))
+                counter += 1
+    return (
+        {nodes[node]: distance for node, distance in distances.items()},
+        {nodes[node]: None if parent is None else nodes[parent] for node, parent in predecessors.items()},
+    )
+
+
+def odd_node_paths(graph, odd_nodes, limit=None):
+    if isinstance(graph, CSRGraph):
+        # CSRGraph nie ma słownika graph.graph, drzewa żyją tylko w tym wywołaniu
+        trees = {}
+    else:
+        # klucz obejmuje wszystkie krawędzie z wagami, więc każda edycja grafu unieważnia drzewa
+        signature = hash(tuple(graph.edges(data="weight")))
+        cached = graph.graph.get("shortest_paths")
+        if cached is None or cached[0] != signature:
+            cached = (signature, {})
+            graph.graph["shortest_paths"] = cached
+        trees = cached[1]
+
+    adjacency = None
+    targets = set(odd_nodes)
+    paths = {}
+    for node in odd_nodes:
+        tree = trees.get(node)
+        if tree is None or tree[2] is not None and (limit is None or tree[2] < limit):
+            if adjacency is None:
+                adjacency = adjacency_lists(graph)
+            distances, predecessors = dijkstra(adjacency, node, targets, limit)
+            tree = (distances, predecessors, limit)
+            trees[node] = tree
+        paths[node] = tree[:2]
+    return paths
+
+
+def nearest_odd_nodes(odd_nodes, paths, count):
+    odd_set = set(odd_nodes)
+    nearest = {}
+    for u in odd_nodes:
+        nearest[u] = []
+        for v, distance in paths[u][0].items():
+            if v != u and v in odd_set:
+                nearest[u].append((distance, v))
+                if len(nearest[u]) >= count:
+                    break
+    return nearest
+
+
+def pair_distance(paths, u, v):
+    if v in paths[u][0]:
+        return paths[u][0][v]
+    return paths[v][0][u]
+
+
+def pair_greedily(nodes, paths):
+    candidates = sorted(
+        (paths[u][0][v], u, v) for i, u in enumerate(nodes) for v in nodes[i + 1:]
+    )
+    return greedy_matching(candidates)
+
+
+def match_odd_nodes(graph, odd_nodes, paths, mode="exact", neighbours=10):
+    nearest = nearest_odd_nodes(odd_nodes, paths, 1 if mode == "exact" else neighbours)
+    matching_graph = nx.Graph()
+    matching_graph.add_nodes_from(odd_nodes)
+
+    if mode == "exact":
+        for i, u in enumerate(odd_nodes):
+            for v in odd_nodes[i + 1:]:
+                matching_graph.add_edge(u, v, weight=paths[u][0][v])
+        matching = list(nx.min_weight_matching(matching_graph))
+    elif mode == "knn":
+        for u in odd_nodes:
+            for distance, v in nearest[u]:
+                matching_graph.add_edge(u, v, weight=distance)
+        matching = list(nx.min_weight_matching(matching_graph))
+    elif mode == "greedy":
+        matching = greedy_matching(sorted((distance, u, v) for u in odd_nodes for distance, v in nearest[u]))
+    else:
+        raise ValueError(f"Unknown matching mode: {mode}")
+
+    matched = {node for edge in matching for node in edge}
+    left = [node for node in odd_nodes if node not in matched]
+    if left:
+        paths.update(odd_node_paths(graph, left))
+        matching += pair_greedily(left, paths)
+
+    for u, v in matching:
+        matching_graph.add_edge(u, v, weight=pair_distance(paths, u, v))
+    cost = sum(pair_distance(paths, u, v) for u, v in matching)
+    lower_bound = sum(nearest[u][0][0] for u in odd_nodes) / 2
+    return matching_graph, matching, matching_report(mode, cost, lower_bound)
+
+
+def expand_path(predecessors, source, target):
+    path = [target]
+    while path[-1] != source:
+        path.append(predecessors[path[-1]])
+    path.reverse()
+    return path
+
+
 def plot_graph(graph, path=None):
+    if is_headless():
+        return
+    if isinstance(graph, CSRGraph):
+        graph = to_networkx(graph)
+    import matplotlib.pyplot as plt
     pos = nx.shell_layout(graph)
     edge_labels = nx.get_edge_attributes(graph, "weight")
     edge_colors = ['red' if path and (u, v) in path or (v, u) in path else 'black' for u, v in graph.edges(data=False)]
@@ -62,6 +360,11 @@ def plot_graph(graph, path=None):
 
 
 def plot_graphs(graph):
+    if is_headless():
+        return
+    if isinstance(graph, CSRGraph):
+        graph = to_networkx(graph)
+    import matplotlib.pyplot as plt
     connectionstyle = [f"arc3,rad={r}" for r in it.accumulate([0.15] * 4)]
     pos = nx.shell_layout(graph)
 
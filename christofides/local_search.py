@@ -0,0 +1,118 @@
+import time
+from collections import deque
+
+import numpy as np
+
+
+def neighbour_lists(distances, count):
+    count = min(count, len(distances) - 1)
+    if count <= 0:
+        return [[] for _ in range(len(distances))]
+    nearest = np.argpartition(distances, count, axis=1)[:, :count + 1]
+    order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind="stable")
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    return [[int(c) for c in row if c != city][:count] for city, row in enumerate(nearest)]
+
+
+def reverse(tour, position, i, j):
+    n = len(tour)
+    if (j - i) % n + 1 > n // 2:
+        i, j = (j + 1) % n, (i - 1) % n
+    if i <= j:
+        indices = np.arange(i, j + 1)
+    else:
+        indices = np.concatenate((np.arange(i, n), np.arange(0, j + 1)))
+    tour[indices] = tour[indices[::-1]]
+    position[tour[indices]] = indices
+
+
+def two_opt_move(tour, position, a, distance, neighbours):
+    n = len(tour)
+    for direction in (1, -1):
+        b = tour[(position[a] + direction) % n]
+        d_ab = distance(a, b)
+        for c in neighbours[a]:
+            d_ac = distance(a, c)
+            if d_ac >= d_ab:
+                break
+            d = tour[(position[c] + direction) % n]
+            if c == a or c == b or d == a:
+                continue
+            delta = d_ac + distance(b, d) - d_ab - distance(c, d)
+            if delta < -1e-9:
+                if direction == 1:
+                    reverse(tour, position, position[b], position[c])
+                else:
+                    reverse(tour, position, position[a], position[d])
+                return [a, b, c, d]
+    return None
+
+
+def or_opt_move(tour, position, a, distance, neighbours, max_segment=3):
+    n = len(tour)
+    for length in range(1, min(max_segment, n - 3) + 1):
+        start = position[a]
+        segment = [tour[(start + k) % n] for k in range(length)]
+        first, last = segment[0], segment[-1]
+        before = tour[(start - 1) % n]
+        after = tour[(start + length) % n]
+        removed = distance(before, first) + distance(last, after) - distance(before, after)
+        for c in neighbours[a]:
+            if c in segment:
+                continue
+            for e in (tour[(position[c] + 1) % n], tour[(position[c] - 1) % n]):
+                if e in segment:
+                    continue
+                added_forward = distance(c, first) + distance(last, e) - distance(c, e)
+                added_reversed = distance(c, last) + distance(first, e) - distance(c, e)
+                added = min(added_forward, added_reversed)
+                if added < removed - 1e-9:
+                    move_segment(tour, position, start, length, c, e, added_reversed < added_forward)
+                    return segment + [before, after, c, e]
+    return None
+
+
+def move_segment(tour, position, start, length, c, e, reversed_segment):
+    n = len(tour)
+    indices = (start + np.arange(length)) % n
+    segment = tour[indices]
+    rest = np.delete(tour, indices)
+    c_index = int(np.nonzero(rest == c)[0][0])
+    e_index = int(np.nonzero(rest == e)[0][0])
+    if (c_index + 1) % len(rest) == e_index:
+        insert_at = c_index + 1
+        piece = segment[::-1] if reversed_segment else segment
+    else:
+        insert_at = e_index + 1
+        piece = segment if reversed_segment else segment[::-1]
+    tour[:] = np.concatenate((rest[:insert_at], piece, rest[insert_at:]))
+    position[tour] = np.arange(n)
+
+
+def improve_tour(tour, distance, neighbours, time_limit=1.0):
+    tour = np.array(tour)
+    n = len(tour)
+    if n < 5:
+        return tour
+    position = np.empty(n, dtype=int)
+    position[tour] = np.arange(n)
+
+    deadline = time.perf_counter() + time_limit
+    active = deque(tour.tolist())
+    queued = set(active)
+    steps = 0
+    while active:
+        steps += 1
+        if steps % 64 == 0 and time.perf_counter() > deadline:
+            break
+        a = active.popleft()
+        queued.discard(a)
+        touched = two_opt_move(tour, position, a, distance, neighbours)
+        if touched is None:
+            touched = or_opt_move(tour, position, a, distance, neighbours)
+        if touched is not None:
+            for city in touched:
+                if city not in queued:
+                    queued.add(city)
+                    active.append(city)
+    return tour
@@ -1,7 +1,19 @@
 import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
+import time
+import math
+from graphs.render import is_headless
+from graphs.matching import greedy_matching
+from christofides.local_search import improve_tour, neighbour_lists
+from graphs.coordinateGraph import CoordinateGraph
+from graphs.csrGraph import CSRGraph, to_networkx
 
 def plot_graph(graph, path=None):
+    if is_headless():
+        return
+    import matplotlib.pyplot as plt
+    if isinstance(graph, CSRGraph):
+        graph = to_networkx(graph)
     pos = nx.shell_layout(graph)
     edge_labels = nx.get_edge_attributes(graph, "weight")
 
@@ -15,60 +27,229 @@ def plot_graph(graph, path=None):
     plt.show()
 
 
+def distance_matrix(graph):
+    if isinstance(graph, CSRGraph):
+        n = graph.number_of_nodes()
+        rows, cols = graph.sources(), graph.indices
+        if graph.weights is None:
+            raise ValueError("Christofides requires a weighted graph")
+        loops = rows == cols
+        weights = graph.weights[~loops]
+        distances = np.zeros((n, n), dtype=weights.dtype)
+        distances[rows[~loops], cols[~loops]] = weights
+        distances[cols[~loops], rows[~loops]] = weights
+        return graph.nodes, distances
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = [(index[u], index[v], weight) for u, v, weight in graph.edges(data="weight") if u != v]
+    if not edges:
+        return nodes, np.zeros((len(nodes), len(nodes)))
+    rows, cols, weights = (np.array(column) for column in zip(*edges))
+    distances = np.zeros((len(nodes), len(nodes)), dtype=weights.dtype)
+    distances[rows, cols] = weights
+    distances[cols, rows] = weights
+    return nodes, distances
+
+
 def is_full(graph):
-    n = len(graph.nodes)
-    return all(graph.has_edge(u, v) for u in graph.nodes for v in graph.nodes if u != v)
-
-
-def check_triangle_sides_condition(graph):
-    for clique in nx.enumerate_all_cliques(graph):
-        if len(clique) == 3:
-            u, v, w = clique
-            if (graph[u][v]['weight'] + graph[u][w]['weight'] < graph[v][w]['weight'] or
-                    graph[u][v]['weight'] + graph[v][w]['weight'] < graph[u][w]['weight'] or
-                    graph[u][w]['weight'] + graph[v][w]['weight'] < graph[u][v]['weight']):
-                return False
+    n = graph.number_of_nodes()
+    if isinstance(graph, CSRGraph):
+        # get_edge_list usuwa powtórzenia, więc pętle też liczymy bez powtórzeń
+        loops = graph.indices[graph.sources() == graph.indices]
+        return len(graph.get_edge_list()) - len(np.unique(loops)) == n * (n - 1) // 2
+    return graph.number_of_edges() - nx.number_of_selfloops(graph) == n * (n - 1) // 2
+
+
+def check_triangle_sides_condition(distances, block=8):
+    # min-plus po kafelkach block x block x n: tablice pośrednie mieszczą się w cache
+    tolerance = 1e-9 if np.issubdtype(distances.dtype, np.floating) else 0
+    n = len(distances)
+    for i in range(0, n, block):
+        limit = distances[i:i + block] - tolerance
+        shortest = limit.copy()
+        for k in range(0, n, block):
+            through = distances[i:i + block, k:k + block, None] + distances[None, k:k + block]
+            np.minimum(shortest, through.min(axis=1), out=shortest)
+        if np.any(shortest < limit):
+            return False
     return True
 
 
-def build_multigraph(tree, matching, graph):
+def minimum_spanning_tree(distances):
+    n = len(distances)
+    in_tree = np.zeros(n, dtype=bool)
+    best = np.full(n, np.inf)
+    parent = np.zeros(n, dtype=int)
+    best[0] = 0
+    edges = []
+    for _ in range(n):
+        v = int(np.argmin(best))
+        if v != 0:
+            edges.append((int(parent[v]), v))
+        in_tree[v] = True
+        best[v] = np.inf
+        closer = ~in_tree & (distances[v] < best)
+        best[closer] = distances[v][closer]
+        parent[closer] = v
+    return edges
+
+
+def build_multigraph(tree, matching, weight):
     h = nx.MultiGraph(tree)
     for u, v in matching:
-        h.add_edge(u, v, weight=graph[u][v]['weight'])
+        h.add_edge(u, v, weight=weight(u, v))
     return h
 
 
-def find_minimal_matching(graph, odd_nodes):
-    subgraph = nx.Graph()
-    for i in range(len(odd_nodes)):
-        for j in range(1, len(odd_nodes)):
-            u, v = odd_nodes[i], odd_nodes[j]
-            if graph.has_edge(u, v):
-                subgraph.add_edge(u, v, weight=graph[u][v]['weight'])
-    return nx.min_weight_matching(subgraph, weight='weight')
+def find_minimal_matching(distances, odd_nodes, mode="exact"):
+    odd_nodes = np.asarray(odd_nodes)
+    rows, cols = np.triu_indices(len(odd_nodes), 1)
+    us, vs = odd_nodes[rows], odd_nodes[cols]
+    weights = distances[us, vs]
+
+    if mode == "exact":
+        subgraph = nx.Graph()
+        subgraph.add_weighted_edges_from(zip(us.tolist(), vs.tolist(), weights.tolist()))
+        return list(nx.min_weight_matching(subgraph, weight='weight'))
+    elif mode == "greedy":
+        order = np.argsort(weights, kind="stable")
+        candidates = zip(weights[order].tolist(), us[order].tolist(), vs[order].tolist())
+        return greedy_matching(candidates, len(odd_nodes) // 2)
+    raise ValueError(f"Unknown matching mode: {mode}")
+
+
+def euclidean_spanning_tree(points):
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import minimum_spanning_tree as sparse_spanning_tree
+    from scipy.spatial import Delaunay, QhullError, cKDTree
+
+    n = len(points)
+    k = min(n - 1, 4)
+    try:
+        simplices = Delaunay(points).simplices
+        pairs = [simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [0, 2]]]
+    except (QhullError, ValueError):
+        k = min(n - 1, 16)
+        pairs = []
+    _, nearest = cKDTree(points).query(points, k + 1)
+    pairs.append(np.column_stack((np.repeat(np.arange(n), k), nearest[:, 1:].ravel())))
+    # łańcuch po posortowanych współrzędnych: zawsze spójny, dokładne MST dla punktów współliniowych
+    # i zerowe krawędzie między powtórzeniami, które Qhull pomija w triangulacji
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    pairs.append(np.column_stack((order[:-1], order[1:])))
+    pairs = np.concatenate(pairs)
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    lengths = np.hypot(*(points[pairs[:, 0]] - points[pairs[:, 1]]).T)
+    candidates = coo_matrix((lengths + 1e-12, (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    tree = sparse_spanning_tree(candidates).tocoo()
+    return list(zip(tree.row.tolist(), tree.col.tolist()))
+
+
+def euclidean_matching(points, odd_nodes, neighbours=8):
+    from scipy.spatial import cKDTree
+
+    matching = []
+    left = np.asarray(odd_nodes)
+    while len(left) > 1:
+        k = min(neighbours, len(left) - 1)
+        lengths, nearest = cKDTree(points[left]).query(points[left], k + 1)
+        us = np.repeat(left, k)
+        vs = left[nearest[:, 1:].ravel()]
+        weights = lengths[:, 1:].ravel()
+        order = np.argsort(weights, kind="stable")
+        pairs = greedy_matching(zip(weights[order].tolist(), us[order].tolist(), vs[order].tolist()), len(left) // 2)
+        matching += pairs
+        matched = {node for pair in pairs for node in pair}
+        left = np.array([node for node in left.tolist() if node not in matched], dtype=int)
+    return matching
+
+
+def euclidean_christofides(graph, source, improve=False, time_limit=1.0, neighbours=8):
+    from scipy.spatial import cKDTree
 
+    points = graph.get_coordinates()
+    n = len(points)
+    if n < 3:
+        path = graph.nodes + graph.nodes[:1]
+        return sum(graph.get_distance(u, v) for u, v in zip(path, path[1:])), ' -> '.join(path)
+
+    tree = euclidean_spanning_tree(points)
+    degrees = np.bincount(np.array(tree).ravel(), minlength=n)
+    odd_nodes = np.nonzero(degrees % 2)[0]
+
+    start = time.perf_counter()
+    matching = euclidean_matching(points, odd_nodes, neighbours)
+    print(f"Matching (kd-tree greedy) time: {time.perf_counter() - start:.3f} s")
+
+    h = nx.MultiGraph()
+    h.add_edges_from(tree)
+    h.add_edges_from(matching)
+    visited = np.zeros(n, dtype=bool)
+    tour = []
+    for u, v in nx.eulerian_circuit(h, source=graph.index.get(source)):
+        for node in (u, v):
+            if not visited[node]:
+                visited[node] = True
+                tour.append(node)
+    tour = np.array(tour)
+
+    def length(tour):
+        return np.hypot(*(points[tour] - points[np.roll(tour, -1)]).T).sum().item()
+
+    weight = length(tour)
+    if improve:
+        xs, ys = graph.x, graph.y
+
+        def distance(a, b):
+            return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+        start = time.perf_counter()
+        count = min(neighbours, n - 1)
+        _, nearest = cKDTree(points).query(points, count + 1)
+        # przy powtórzonych współrzędnych pierwszym trafieniem nie musi być samo miasto
+        nearest = [[c for c in row.tolist() if c != city][:count] for city, row in enumerate(nearest)]
+        tour = improve_tour(tour, distance, nearest, time_limit)
+        improved = length(tour)
+        print(f"Local search: {weight} -> {improved} ({time.perf_counter() - start:.3f} s)")
+        weight = improved
+
+    path = [graph.nodes[i] for i in tour]
+    if source in graph.index:
+        start_index = path.index(source)
+        path = path[start_index:] + path[:start_index] + [source]
+    graph.plot_graph(path)
+    return weight, ' -> '.join(path)
+
+
+def christofides(graph, source, check_metric=True, matching="exact", improve=False, time_limit=1.0, neighbours=8):
+    if isinstance(graph, CoordinateGraph):
+        return euclidean_christofides(graph, source, improve, time_limit, neighbours)
 
-def christofides(graph, source):
     plot_graph(graph)
 
     if not is_full(graph):
         print("Graph is not full")
         return None, "No path possible"
 
-    if not check_triangle_sides_condition(graph):
+    nodes, distances = distance_matrix(graph)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    if check_metric and not check_triangle_sides_condition(distances):
         print("Triangle sides condition not satisfied")
         return None, "No path possible"
 
-    t = nx.minimum_spanning_tree(graph)
+    t = nx.Graph()
+    t.add_nodes_from(nodes)
+    for u, v in minimum_spanning_tree(distances):
+        t.add_edge(nodes[u], nodes[v], weight=distances[u, v].item())
     plot_graph(t)
 
-    odd_nodes = []
-    for node in t.nodes:
-        if t.degree(node) % 2 != 0:
-            odd_nodes.append(node)
+    odd_nodes = [index[node] for node in t.nodes if t.degree(node) % 2 != 0]
 
-    m = find_minimal_matching(graph, odd_nodes)
-    h = build_multigraph(t, m, graph)
+    start = time.perf_counter()
+    m = [(nodes[u], nodes[v]) for u, v in find_minimal_matching(distances, odd_nodes, matching)]
+    print(f"Matching ({matching}) time: {time.perf_counter() - start:.3f} s")
+    h = build_multigraph(t, m, lambda u, v: distances[index[u], index[v]].item())
     plot_graph(h, m)
 
     eulerian = list(nx.eulerian_circuit(h))
@@ -82,11 +263,19 @@ def christofides(graph, source):
             path.append(v)
             visited.add(v)
 
+    tour = np.array([index[node] for node in path])
+    weight = distances[tour, np.roll(tour, -1)].sum().item()
+
+    if improve:
+        start = time.perf_counter()
+        tour = improve_tour(tour, distances.item, neighbour_lists(distances, neighbours), time_limit)
+        improved = distances[tour, np.roll(tour, -1)].sum().item()
+        print(f"Local search: {weight} -> {improved} ({time.perf_counter() - start:.3f} s)")
+        path = [nodes[i] for i in tour]
+        weight = improved
+
     path_edges = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
     path_edges.append((path[-1], path[0]))
-    weight = 0
-    for edge in path_edges:
-        weight += graph[edge[0]][edge[1]]['weight']
 
     plot_graph(graph, path_edges)
 
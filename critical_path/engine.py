@@ -0,0 +1,356 @@
+import csv
+import heapq
+import json
+import os
+
+import numpy as np
+
+from graphs.csrGraph import CSRGraph, build_csr
+
+
+class TaskNetwork:
+    def __init__(self, tasks):
+        if isinstance(tasks, CSRGraph):
+            self.from_csr(tasks)
+            return
+        self.ids = list(tasks)
+        self.index = {task_id: i for i, task_id in enumerate(self.ids)}
+        self.durations = np.array([tasks[task_id]['duration'] for task_id in self.ids])
+
+        sources, targets = [], []
+        for task_id in self.ids:
+            for pred in tasks[task_id]['predecessors']:
+                if pred not in self.index:
+                    raise ValueError(f"Task {task_id} depends on unknown task {pred}")
+                sources.append(self.index[pred])
+                targets.append(self.index[task_id])
+
+        n = len(self.ids)
+        self.pred_indptr, self.pred_indices, _ = build_csr(targets, sources, n)
+        self.succ_indptr, self.succ_indices, _ = build_csr(sources, targets, n)
+        self.order = self.topological_order()
+
+    def from_csr(self, graph):
+        # wiersz grafu zadań = poprzednicy, transpozycja = następnicy
+        self.ids = graph.nodes
+        self.index = graph.index
+        durations = graph.node_weights
+        if durations is None:
+            raise ValueError("Task graph has no durations")
+        self.durations = np.asarray(durations[:, 1] if durations.ndim > 1 else durations)
+        self.pred_indptr, self.pred_indices = graph.indptr, graph.indices
+        successors = graph.transpose()
+        self.succ_indptr, self.succ_indices = successors.indptr, successors.indices
+        self.order = self.topological_order()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def topological_order(self):
+        in_degree = np.diff(self.pred_indptr).tolist()
+        indptr = self.succ_indptr.tolist()
+        indices = self.succ_indices.tolist()
+        order = [v for v in range(len(self.ids)) if in_degree[v] == 0]
+        for v in order:
+            for k in range(indptr[v], indptr[v + 1]):
+                s = indices[k]
+                in_degree[s] -= 1
+                if in_degree[s] == 0:
+                    order.append(s)
+        if len(order) != len(self.ids):
+            raise ValueError("Task dependencies contain a cycle")
+        return np.array(order, dtype=np.int64)
+
+
+def schedule_network(network):
+    n = len(network)
+    durations = network.durations.tolist()
+    order = network.order.tolist()
+
+    # najwcześniejszy czas startu
+    indptr = network.pred_indptr.tolist()
+    indices = network.pred_indices.tolist()
+    earliest = [0] * n
+    for v in order:
+        start = 0
+        for k in range(indptr[v], indptr[v + 1]):
+            p = indices[k]
+            finish = earliest[p] + durations[p]
+            if finish > start:
+                start = finish
+        earliest[v] = start
+
+    # długość uszeregowania
+    project_duration = max((earliest[v] + durations[v] for v in range(n)), default=0)
+
+    # najpóźniejszy czas startu
+    indptr = network.succ_indptr.tolist()
+    indices = network.succ_indices.tolist()
+    latest = [0] * n
+    for v in reversed(order):
+        finish = project_duration
+        for k in range(indptr[v], indptr[v + 1]):
+            s = latest[indices[k]]
+            if s < finish:
+                finish = s
+        latest[v] = finish - durations[v]
+
+    return earliest, latest, project_duration
+
+
+def network_properties(network):
+    earliest, latest, project_duration = schedule_network(network)
+    earliest_start_times = dict(zip(network.ids, earliest))
+    latest_start_times = dict(zip(network.ids, latest))
+    critical_path = [task_id for task_id, e, l in zip(network.ids, earliest, latest) if e == l]
+    return earliest_start_times, latest_start_times, critical_path, project_duration
+
+
+class Schedule:
+    def __init__(self, tasks):
+        network = TaskNetwork(tasks)
+        n = len(network)
+        self.ids = list(network.ids)
+        self.index = dict(network.index)
+        self.durations = network.durations.tolist()
+        self.predecessors = [[] for _ in range(n)]
+        self.successors = [[] for _ in range(n)]
+        indptr = network.succ_indptr.tolist()
+        indices = network.succ_indices.tolist()
+        for v in range(n):
+            for s in indices[indptr[v]:indptr[v + 1]]:
+                self.successors[v].append(s)
+                self.predecessors[s].append(v)
+
+        self.position = [0] * n
+        for i, v in enumerate(network.order.tolist()):
+            self.position[v] = i
+
+        earliest, latest, project_duration = schedule_network(network)
+        self.earliest = earliest
+        self.tail = [project_duration - start for start in latest]
+        self.finish_times = [(-(earliest[v] + self.durations[v]), v) for v in range(n)]
+        heapq.heapify(self.finish_times)
+
+    def project_duration(self):
+        while self.finish_times:
+            finish, v = self.finish_times[0]
+            if -finish == self.earliest[v] + self.durations[v]:
+                return -finish
+            heapq.heappop(self.finish_times)
+        return 0
+
+    def earliest_start(self, task_id):
+        return self.earliest[self.index[task_id]]
+
+    def latest_start(self, task_id):
+        return self.project_duration() - self.tail[self.index[task_id]]
+
+    def slack(self, task_id):
+        return self.latest_start(task_id) - self.earliest_start(task_id)
+
+    def critical_path(self):
+        project_duration = self.project_duration()
+        return [
+            task_id for v, task_id in enumerate(self.ids)
+            if project_duration - self.tail[v] == self.earliest[v]
+        ]
+
+    def properties(self):
+        project_duration = self.project_duration()
+        earliest_start_times = dict(zip(self.ids, self.earliest))
+        latest_start_times = {task_id: project_duration - self.tail[v] for v, task_id in enumerate(self.ids)}
+        return earliest_start_times, latest_start_times, self.critical_path(), project_duration
+
+    def update_duration(self, task_id, duration):
+        v = self.index[task_id]
+        if self.durations[v] == duration:
+            return
+        self.durations[v] = duration
+        heapq.heappush(self.finish_times, (-(self.earliest[v] + duration), v))
+        self.propagate_forward(self.successors[v])
+        self.propagate_backward([v])
+
+    def add_dependency(self, pred, task_id):
+        if pred not in self.index or task_id not in self.index:
+            raise ValueError(f"Unknown task in dependency {pred} -> {task_id}")
+        a, b = self.index[pred], self.index[task_id]
+        if b in self.successors[a]:
+            return
+        if a == b:
+            raise ValueError(f"Dependency {pred} -> {task_id} would create a cycle")
+        if self.position[a] > self.position[b]:
+            self.reorder(a, b)
+        self.successors[a].append(b)
+        self.predecessors[b].append(a)
+        self.propagate_forward([b])
+        self.propagate_backward([a])
+
+    def reorder(self, a, b):
+        # Pearce-Kelly: przesunięcie tylko obszaru między b i a w porządku topologicznym
+        upper = self.position[a]
+        lower = self.position[b]
+        forward = self.reachable(b, self.successors, lambda v: self.position[v] <= upper)
+        if a in forward:
+            raise ValueError(f"Dependency {self.ids[a]} -> {self.ids[b]} would create a cycle")
+        backward = self.reachable(a, self.predecessors, lambda v: self.position[v] >= lower)
+        nodes = sorted(backward, key=self.position.__getitem__) + sorted(forward, key=self.position.__getitem__)
+        slots = sorted(self.position[v] for v in nodes)
+        for v, slot in zip(nodes, slots):
+            self.position[v] = slot
+
+    @staticmethod
+    def reachable(start, edges, inside):
+        seen = {start}
+        stack = [start]
+        while stack:
+            v = stack.pop()
+            for u in edges[v]:
+                if u not in seen and inside(u):
+                    seen.add(u)
+                    stack.append(u)
+        return seen
+
+    def propagate_forward(self, nodes):
+        queue = [(self.position[v], v) for v in set(nodes)]
+        queued = set(nodes)
+        heapq.heapify(queue)
+        while queue:
+            _, v = heapq.heappop(queue)
+            queued.discard(v)
+            start = max((self.earliest[p] + self.durations[p] for p in self.predecessors[v]), default=0)
+            if start == self.earliest[v]:
+                continue
+            self.earliest[v] = start
+            heapq.heappush(self.finish_times, (-(start + self.durations[v]), v))
+            for s in self.successors[v]:
+                if s not in queued:
+                    queued.add(s)
+                    heapq.heappush(queue, (self.position[s], s))
+
+    def propagate_backward(self, nodes):
+        queue = [(-self.position[v], v) for v in set(nodes)]
+        queued = set(nodes)
+        heapq.heapify(queue)
+        while queue:
+            _, v = heapq.heappop(queue)
+            queued.discard(v)
+            tail = self.durations[v] + max((self.tail[s] for s in self.successors[v]), default=0)
+            if tail == self.tail[v]:
+                continue
+            self.tail[v] = tail
+            for p in self.predecessors[v]:
+                if p not in queued:
+                    queued.add(p)
+                    heapq.heappush(queue, (-self.position[p], p))
+
+
+def sample_durations(estimates, scenarios, rng, distribution="pert"):
+    low, mode, high = (estimates[:, i:i + 1] for i in range(3))
+    width = high - low
+    spread = np.where(width > 0, width, 1)
+    if distribution == "pert":
+        alpha = 1 + 4 * (mode - low) / spread
+        beta = 1 + 4 * (high - mode) / spread
+        fraction = rng.beta(alpha, beta, size=(len(estimates), scenarios))
+    elif distribution == "triangular":
+        peak = (mode - low) / spread
+        u = rng.random((len(estimates), scenarios))
+        fraction = np.where(u < peak, np.sqrt(u * peak), 1 - np.sqrt((1 - u) * (1 - peak)))
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    return low + width * fraction
+
+
+def simulate(tasks, scenarios=10000, distribution="pert", seed=None, quantiles=(0.5, 0.8, 0.95), batch=None):
+    network = TaskNetwork(tasks)
+    n = len(network)
+    estimates = np.array([
+        tasks[task_id].get('estimate', (tasks[task_id]['duration'],) * 3) for task_id in network.ids
+    ], dtype=float).reshape(n, 3)
+    if np.any(estimates[:, 0] > estimates[:, 1]) or np.any(estimates[:, 1] > estimates[:, 2]):
+        raise ValueError("Estimates must satisfy optimistic <= most likely <= pessimistic")
+
+    rng = np.random.default_rng(seed)
+    batch = batch or max(1, min(scenarios, 20_000_000 // max(n, 1)))
+    order = network.order.tolist()
+    pred_indptr, pred_indices = network.pred_indptr.tolist(), network.pred_indices
+    succ_indptr, succ_indices = network.succ_indptr.tolist(), network.succ_indices
+
+    totals = []
+    critical_counts = np.zeros(n)
+    for done in range(0, scenarios, batch):
+        size = min(batch, scenarios - done)
+        durations = sample_durations(estimates, size, rng, distribution)
+
+        finish = np.empty_like(durations)
+        for v in order:
+            preds = pred_indices[pred_indptr[v]:pred_indptr[v + 1]]
+            if len(preds):
+                finish[v] = finish[preds].max(axis=0) + durations[v]
+            else:
+                finish[v] = durations[v]
+        project = finish.max(axis=0)
+
+        tail = np.empty_like(durations)
+        for v in reversed(order):
+            succs = succ_indices[succ_indptr[v]:succ_indptr[v + 1]]
+            if len(succs):
+                tail[v] = tail[succs].max(axis=0) + durations[v]
+            else:
+                tail[v] = durations[v]
+
+        # tylko tolerancja bezwzględna: względna przy dużych czasach uznawała niezależne zadania za krytyczne
+        critical = np.isclose(finish - durations + tail, project, rtol=0, atol=1e-6)
+        critical_counts += critical.sum(axis=1)
+        totals.append(project)
+
+    totals = np.concatenate(totals) if totals else np.zeros(0)
+    return {
+        'scenarios': scenarios,
+        'mean': float(totals.mean()) if scenarios else 0.0,
+        'std': float(totals.std()) if scenarios else 0.0,
+        'quantiles': {q: float(np.quantile(totals, q)) for q in quantiles} if scenarios else {},
+        'criticality': dict(zip(network.ids, (critical_counts / max(scenarios, 1)).tolist())),
+    }
+
+
+def assign_machines(schedule):
+    assignment = {}
+    free_at = []
+    machines = 0
+    # przy równym starcie zadania zerowej długości idą pierwsze, tak jak w skanowaniu first-fit
+    for task_id, (start, end) in sorted(schedule.items(), key=lambda x: x[1]):
+        if free_at and free_at[0][0] <= start:
+            _, machine = heapq.heappop(free_at)
+        else:
+            machine = machines
+            machines += 1
+        assignment[task_id] = machine
+        heapq.heappush(free_at, (end, machine))
+    return assignment, machines
+
+
+def export_assignment(schedule, assignment, file_path, critical_path=(), file_format=None):
+    file_format = file_format or os.path.splitext(file_path)[1].lstrip('.').lower()
+    critical_path = set(critical_path)
+    rows = [
+        {
+            'task': task_id,
+            'machine': assignment[task_id] + 1,
+            'start': start,
+            'end': end,
+            'critical': task_id in critical_path,
+        }
+        for task_id, (start, end) in sorted(schedule.items(), key=lambda x: (assignment[x[0]], x[1][0]))
+    ]
+
+    with open(file_path, 'w', newline='') as file:
+        if file_format == 'csv':
+            writer = csv.DictWriter(file, fieldnames=['task', 'machine', 'start', 'end', 'critical'])
+            writer.writeheader()
+            writer.writerows(rows)
+        elif file_format == 'json':
+            json.dump(rows, file, indent=2)
+        else:
+            raise ValueError(f"Unsupported export format: {file_format}")
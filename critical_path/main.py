@@ -1,18 +1,23 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-from prettytable import PrettyTable
 import itertools as it
+import os
+from graphs.render import is_headless
+from graphs.csrGraph import is_binary, load_graph
+from critical_path.engine import TaskNetwork, network_properties, simulate, assign_machines, export_assignment
 
 
-def create_task(task_id, duration, predecessors=None):
-    return {
+def create_task(task_id, duration, predecessors=None, estimate=None):
+    task = {
         'id': task_id,
         'duration': duration,
         'predecessors': predecessors or []
     }
+    if estimate is not None:
+        task['estimate'] = estimate
+    return task
 
 
 def build_network(tasks):
+    import networkx as nx
     g = nx.DiGraph()
 
     for task_id, task in tasks.items():
@@ -26,51 +31,8 @@ def build_network(tasks):
     return g
 
 
-def calculate_network_properties(tasks, graph):
-   # najwcześniejszy czas startu
-    earliest_start_times = {}
-    sorted_nodes = list(nx.topological_sort(graph))
-
-    for node in sorted_nodes:
-        predecessors = list(graph.predecessors(node))
-
-        if not predecessors:
-            earliest_start_times[node] = 0
-        else:
-            max_predecessor_finish = max(
-                earliest_start_times[pred] + tasks[pred]['duration']
-                for pred in predecessors
-            )
-            earliest_start_times[node] = max_predecessor_finish
-
-    # długość uszeregowania
-    project_duration = max(
-        earliest_start_times[node] + tasks[node]['duration']
-        for node in graph.nodes
-    )
-
-    # najpóźniejszy czas startu
-    latest_start_times = {}
-    sorted_nodes_reversed = list(reversed(list(nx.topological_sort(graph))))
-
-    for node in sorted_nodes_reversed:
-        successors = list(graph.successors(node))
-
-        if not successors:
-            latest_start_times[node] = project_duration - tasks[node]['duration']
-        else:
-            min_successor_start = min(
-                latest_start_times[s] - tasks[node]['duration']
-                for s in successors
-            )
-            latest_start_times[node] = min_successor_start
-
-    critical_path = [
-        node for node, task in tasks.items()
-        if (latest_start_times[node] == earliest_start_times[node])
-    ]
-
-    return earliest_start_times, latest_start_times, critical_path, project_duration
+def calculate_network_properties(tasks, graph=None):
+    return network_properties(TaskNetwork(tasks))
 
 
 def get_schedule(tasks, earliest_start_times):
@@ -84,6 +46,10 @@ def get_schedule(tasks, earliest_start_times):
 
 
 def visualize_network(graph, tasks, critical_path):
+    if is_headless():
+        return
+    import matplotlib.pyplot as plt
+    import networkx as nx
     plt.figure(figsize=(14, 10))
     connectionstyle = [f"arc3,rad={r}" for r in it.accumulate([0.15] * 4)]
     pos = nx.spring_layout(graph, k=1.5, iterations=50)
@@ -111,19 +77,12 @@ def visualize_network(graph, tasks, critical_path):
 
 
 def create_gantt_chart(schedule, critical_path):
+    if is_headless():
+        return
+    import matplotlib.pyplot as plt
 
-    task_assignments = []
-    task_to_machine = {}
-
-    for task_id, (start, end) in sorted(schedule.items(), key=lambda x: x[1][0]):
-        for machine_idx, machine_tasks in enumerate(task_assignments):
-            if all(end <= t_start or start >= t_end for t_start, t_end in machine_tasks):
-                machine_tasks.append((start, end))
-                task_to_machine[task_id] = machine_idx
-                break
-        else:
-            task_assignments.append([(start, end)])
-            task_to_machine[task_id] = len(task_assignments) - 1
+    task_to_machine, machines = assign_machines(schedule)
+    critical_path = set(critical_path)
 
     plt.figure(figsize=(12, 6))
 
@@ -138,13 +97,14 @@ def create_gantt_chart(schedule, critical_path):
 
     plt.xlabel("Czas")
     plt.ylabel("Maszyny")
-    plt.yticks(range(len(task_assignments)), [f"{i + 1}" for i in range(len(task_assignments))])
+    plt.yticks(range(machines), [f"{i + 1}" for i in range(machines)])
     plt.grid(axis='x', linestyle='--', alpha=0.7)
     plt.show()
     plt.close()
 
 
 def print_analysis(tasks, earliest_start_times, latest_start_times, critical_path, project_duration):
+    from prettytable import PrettyTable
     print("=== Analiza Ścieżki Krytycznej ===\n")
 
     project_table = PrettyTable()
@@ -172,40 +132,95 @@ def print_analysis(tasks, earliest_start_times, latest_start_times, critical_pat
     print(table)
 
 
-def analyze_critical_path(tasks):
-    graph = build_network(tasks)
-
+def analyze_critical_path(tasks, export_path=None):
     earliest_start_times, latest_start_times, critical_path, project_duration = (
-        calculate_network_properties(tasks, graph)
+        network_properties(TaskNetwork(tasks))
     )
 
     print_analysis(tasks, earliest_start_times, latest_start_times, critical_path, project_duration)
 
-    visualize_network(graph, tasks, critical_path)
+    if not is_headless():
+        visualize_network(build_network(tasks), tasks, critical_path)
 
     schedule = get_schedule(tasks, earliest_start_times)
+    if export_path:
+        assignment, _ = assign_machines(schedule)
+        export_assignment(schedule, assignment, export_path, critical_path)
     create_gantt_chart(schedule, critical_path)
 
     return earliest_start_times, latest_start_times, critical_path, project_duration
 
 
+def simulate_critical_path(tasks, scenarios=10000, distribution="pert", seed=None):
+    result = simulate(tasks, scenarios, distribution, seed)
+    print_simulation(result)
+    return result
+
+
+def print_simulation(result):
+    from prettytable import PrettyTable
+
+    print(f"=== Symulacja Monte Carlo ({result['scenarios']} scenariuszy) ===\n")
+
+    duration_table = PrettyTable()
+    duration_table.field_names = ["Statystyka", "Czas trwania projektu"]
+    duration_table.add_row(["Średnia", round(result['mean'], 2)])
+    duration_table.add_row(["Odchylenie standardowe", round(result['std'], 2)])
+    for q, value in result['quantiles'].items():
+        duration_table.add_row([f"Kwantyl {q:.0%}", round(value, 2)])
+    print(duration_table)
+
+    print()
+    table = PrettyTable()
+    table.field_names = ["Zadanie", "Indeks krytyczności"]
+    for task_id, index in result['criticality'].items():
+        table.add_row([task_id, f"{index:.1%}"])
+    print(table)
+
+
+def load_tasks(file_path):
+    graph = load_graph(file_path)
+    if graph.type != "T":
+        raise ValueError(f"{file_path}: expected a task graph, got type {graph.type}")
+    if graph.node_weights is None:
+        raise ValueError(f"{file_path}: task graph has no durations")
+    nodes = graph.nodes
+    tasks = {}
+    for i, task in enumerate(nodes):
+        dependencies = [nodes[j] for j in graph.neighbours(i).tolist()]
+        weight = graph.node_weights[i].tolist()
+        if isinstance(weight, list) and min(weight) < max(weight):
+            estimate = tuple(weight)
+            tasks[task] = create_task(task, estimate[1], dependencies, estimate)
+        else:
+            tasks[task] = create_task(task, weight[1] if isinstance(weight, list) else weight, dependencies)
+    return tasks
+
+
 def parse_data(file_path):
+    if is_binary(file_path):
+        return load_tasks(file_path)
     tasks = {}
     with open(file_path, 'r') as file:
         data = file.readlines()
         for line in data:
             parts = line.strip().split()
             task = parts[0]
-            duration = int(parts[1])
             dependencies = parts[2:] if len(parts) > 2 else []
-            tasks[task] = create_task(task, duration, dependencies)
+            if '/' in parts[1]:
+                # estymacja trzypunktowa: optymistyczny/najbardziej prawdopodobny/pesymistyczny
+                estimate = tuple(int(value) for value in parts[1].split('/'))
+                tasks[task] = create_task(task, estimate[1], dependencies, estimate)
+            else:
+                tasks[task] = create_task(task, int(parts[1]), dependencies)
     return tasks
 
 
 def example_usage():
 
-    tasks = parse_data('data.txt')
+    tasks = parse_data(os.path.join(os.path.dirname(__file__), 'data.txt'))
     analyze_critical_path(tasks)
 
 
-example_usage()
\ No newline at end of file
+if __name__ == "__main__":
+    example_usage()
\ No newline at end of file
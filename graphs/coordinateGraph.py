@@ -0,0 +1,39 @@
+import math
+from graphs.render import is_headless
+
+
+class CoordinateGraph:
+    def __init__(self):
+        self.type = "C"
+        self.nodes = []
+        self.index = {}
+        self.x = []
+        self.y = []
+
+    def add_node(self, label, x=0.0, y=0.0):
+        if label in self.index:
+            return
+        self.index[label] = len(self.nodes)
+        self.nodes.append(label)
+        self.x.append(float(x))
+        self.y.append(float(y))
+
+    def get_distance(self, label1, label2):
+        if label1 in self.index and label2 in self.index:
+            i, j = self.index[label1], self.index[label2]
+            return math.hypot(self.x[i] - self.x[j], self.y[i] - self.y[j])
+
+    def get_coordinates(self):
+        import numpy as np
+        return np.column_stack((self.x, self.y))
+
+    def plot_graph(self, path=None):
+        if is_headless():
+            return
+        import matplotlib.pyplot as plt
+        plt.scatter(self.x, self.y, s=10)
+        if path:
+            tour = [self.index[label] for label in path]
+            plt.plot([self.x[i] for i in tour], [self.y[i] for i in tour], color="red", linewidth=1)
+        plt.gca().set_aspect("equal")
+        plt.show()
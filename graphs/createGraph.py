@@ -1,44 +1,121 @@
+from array import array
+
 from graphs.graph import Graph
 from graphs.directedGraph import DirectedGraph
-import networkx as nx
+from graphs.coordinateGraph import CoordinateGraph
 
 
+GRAPH_TYPES = ("N", "D", "W", "WD", "WM", "C")
 
-def create_graph(file_path):
 
-    weighted = False
+class GraphFileError(ValueError):
+    def __init__(self, file_path, line_number, message):
+        super().__init__(f"{file_path}:{line_number}: {message}")
+        self.file_path = file_path
+        self.line_number = line_number
+        self.message = message
 
-    with open(file_path, "r") as file:
-        data = file.readlines()
-        for i in range(len(data)):
-            data[i] = data[i].rstrip('\n')
-            data[i] = data[i].split(" ")
-
-        if data[0][0] == "N":
-            graph = Graph()
-        elif data[0][0] == "D":
-            graph = DirectedGraph()
-        elif data[0][0] == "W":
-            graph = nx.Graph()
-            weighted = True
-        else:
-            print("Invalid graph type")
-            exit()
 
-        edges = data[1:]
-        nodes = list(set([item for sublist in edges for item in sublist[:2]]))
+def read_header(file, file_path):
+    for line_number, line in enumerate(file, 1):
+        header = line.split()
+        if not header:
+            continue
+        if header[0] not in GRAPH_TYPES:
+            raise GraphFileError(file_path, line_number, f"Invalid graph type: {header[0]}")
+        return header[0], line_number
+    raise GraphFileError(file_path, 0, "Missing graph type header")
+
 
-        for i in range(len(nodes)):
-            graph.add_node(nodes[i])
+def read_edges(file, file_path, graph_type, first_line=1):
+    weighted = graph_type.startswith("W")
+    labels = {}
+    sources = array('l')
+    targets = array('l')
+    weights = [] if weighted else None
+    oneway = array('b') if graph_type == "WM" else None
 
+    for line_number, line in enumerate(file, first_line + 1):
+        edge = line.split()
+        if not edge:
+            continue
+        if len(edge) < (3 if weighted else 2):
+            raise GraphFileError(file_path, line_number, f"Expected an edge, got: {line.strip()}")
+        sources.append(labels.setdefault(edge[0], len(labels)))
+        targets.append(labels.setdefault(edge[1], len(labels)))
         if weighted:
-            for edge in edges:
-                graph.add_edge(edge[0], edge[1], weight=int(edge[2]))
+            try:
+                weights.append(int(edge[2]))
+            except ValueError:
+                raise GraphFileError(file_path, line_number, f"Invalid weight: {edge[2]}") from None
+        if oneway is not None:
+            if edge[3:] not in ([], [">"]):
+                raise GraphFileError(file_path, line_number, f"Invalid edge direction: {' '.join(edge[3:])}")
+            oneway.append(len(edge) > 3)
+
+    return list(labels), sources, targets, weights, oneway
+
+
+def read_coordinates(file, file_path, first_line=1):
+    graph = CoordinateGraph()
+    city = 0
+    for line_number, line in enumerate(file, first_line + 1):
+        row = line.split()
+        if not row:
+            continue
+        if len(row) not in (2, 3):
+            raise GraphFileError(file_path, line_number, f"Expected \"x y\" or \"label x y\", got: {line.strip()}")
+        label = str(city) if len(row) == 2 else row[0]
+        try:
+            graph.add_node(label, row[-2], row[-1])
+        except ValueError:
+            raise GraphFileError(file_path, line_number, f"Invalid coordinates: {' '.join(row[-2:])}") from None
+        city += 1
+    return graph
+
+
+def build_graph(graph_type, labels, sources, targets, weights=None, oneway=None):
+    if graph_type == "N":
+        graph = Graph()
+    elif graph_type == "D":
+        graph = DirectedGraph()
+    else:
+        import networkx as nx
+        if graph_type == "W":
+            graph = nx.Graph()
+        elif graph_type == "WD":
+            graph = nx.DiGraph()
         else:
-            for edge in edges:
-                graph.add_edge(edge[0], edge[1])
+            graph = nx.MultiDiGraph()
 
-        return graph, weighted
+    for label in labels:
+        graph.add_node(label)
 
+    pairs = ((labels[u], labels[v]) for u, v in zip(sources, targets))
+    if graph_type == "WM":
+        graph.add_edges_from(
+            (u, v, {"weight": weight, "oneway": bool(one)})
+            for (u, v), weight, one in zip(pairs, weights, oneway)
+        )
+    elif weights is not None:
+        graph.add_weighted_edges_from((u, v, weight) for (u, v), weight in zip(pairs, weights))
+    else:
+        graph.add_edges(pairs)
+    return graph
 
 
+def create_graph(file_path):
+    from graphs.csrGraph import is_binary, load_graph, to_graph
+    if is_binary(file_path):
+        graph = load_graph(file_path)
+        if graph.type not in ("N", "D", "W", "WD", "WM"):
+            raise GraphFileError(file_path, 0, f"Invalid graph type: {graph.type}")
+        return to_graph(graph), graph.weights is not None
+
+    with open(file_path, "r") as file:
+        graph_type, line_number = read_header(file, file_path)
+        if graph_type == "C":
+            return read_coordinates(file, file_path, line_number), True
+        labels, sources, targets, weights, oneway = read_edges(file, file_path, graph_type, line_number)
+
+    return build_graph(graph_type, labels, sources, targets, weights, oneway), weights is not None
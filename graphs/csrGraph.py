@@ -0,0 +1,331 @@
+import numpy as np
+
+
+MAGIC = b"OKGRAPH1"
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("type", "S4"),
+    ("index_dtype", "S4"),
+    ("weight_dtype", "S4"),
+    ("node_weight_dtype", "S4"),
+    ("nodes", "<i8"),
+    ("edges", "<i8"),
+    ("node_weight_columns", "<i8"),
+    ("oneway", "<i8"),
+    ("label_bytes", "<i8"),
+])
+DIRECTED_TYPES = ("D", "WD", "WM", "T")
+
+
+class CSRGraph:
+    def __init__(self, graph_type, indptr, indices, weights=None, oneway=None, node_weights=None, labels=None):
+        self.type = graph_type
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.oneway = oneway
+        self.node_weights = node_weights
+        # etykiety: lista albo (offsety, bajty) odczytane z pliku, dekodowane dopiero przy użyciu
+        self._labels = labels
+        self._nodes = None
+        self._index = None
+        self._transpose = None
+        self._undirected = None
+        self.file_path = None
+
+    def __reduce__(self):
+        # graf otwarty z pliku przekazujemy do innych procesów jako ścieżkę, każdy mapuje te same strony
+        if self.file_path is not None:
+            return load_graph, (self.file_path,)
+        return CSRGraph, (self.type, self.indptr, self.indices, self.weights, self.oneway, self.node_weights, self.nodes)
+
+    @property
+    def nodes(self):
+        if self._nodes is None:
+            if self._labels is None:
+                self._nodes = [str(i) for i in range(self.number_of_nodes())]
+            elif isinstance(self._labels, tuple):
+                _, blob = self._labels
+                self._nodes = blob.tobytes().decode("utf-8").split("\n")[:-1]
+            else:
+                self._nodes = list(self._labels)
+        return self._nodes
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.nodes)}
+        return self._index
+
+    def number_of_nodes(self):
+        return len(self.indptr) - 1
+
+    def number_of_edges(self):
+        return len(self.indices)
+
+    def neighbours(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def sources(self):
+        return np.repeat(np.arange(self.number_of_nodes(), dtype=self.indices.dtype), np.diff(self.indptr))
+
+    def is_directed(self):
+        return self.type in DIRECTED_TYPES
+
+    def out_degrees(self):
+        return np.diff(self.indptr)
+
+    def in_degrees(self):
+        return np.bincount(self.indices, minlength=self.number_of_nodes())
+
+    def degrees(self):
+        if self.is_directed():
+            return self.out_degrees() + self.in_degrees()
+        return self.undirected().out_degrees()
+
+    def transpose(self):
+        # CSC: wiersz v = krawędzie wchodzące do v
+        if self._transpose is None:
+            n = self.number_of_nodes()
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(self.in_degrees(), out=indptr[1:])
+            self._transpose = CSRGraph(
+                self.type, indptr, self.sources()[order],
+                None if self.weights is None else self.weights[order],
+                None if self.oneway is None else self.oneway[order],
+                self.node_weights, self._labels,
+            )
+            self._transpose._nodes = self._nodes
+        return self._transpose
+
+    def undirected(self):
+        # obie orientacje każdej krawędzi, pętla liczy się podwójnie jak w Graph
+        if self.is_directed():
+            raise ValueError(f"Graph of type {self.type} is directed")
+        if self._undirected is None:
+            sources = self.sources()
+            self._undirected = from_edges(
+                self.type, self.nodes,
+                np.concatenate((sources, self.indices)),
+                np.concatenate((self.indices, sources)),
+                None if self.weights is None else np.concatenate((self.weights, self.weights)),
+            )
+        return self._undirected
+
+    def get_edge_list(self):
+        sources, targets = self.sources(), self.indices
+        if not self.is_directed():
+            sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+        pairs = np.unique(np.column_stack((sources, targets)), axis=0)
+        nodes = self.nodes
+        return [(nodes[u], nodes[v]) for u, v in pairs.tolist()]
+
+
+def smallest_dtype(values, integer=np.int32):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        if values.size == 0 or (values.min() >= np.iinfo(integer).min and values.max() <= np.iinfo(integer).max):
+            return values.astype(integer)
+        return values.astype(np.int64)
+    return values.astype(np.float64)
+
+
+def build_csr(sources, targets, n):
+    sources = np.asarray(sources, dtype=np.int64)
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    index_dtype = np.int32 if n < 2 ** 31 else np.int64
+    return indptr, np.asarray(targets, dtype=index_dtype)[order], order
+
+
+def from_edges(graph_type, labels, sources, targets, weights=None, oneway=None, node_weights=None):
+    indptr, indices, order = build_csr(sources, targets, len(labels))
+    if weights is not None:
+        weights = smallest_dtype(weights)[order]
+    if oneway is not None:
+        oneway = np.asarray(oneway, dtype=np.uint8)[order]
+    if node_weights is not None:
+        node_weights = smallest_dtype(node_weights, np.int64)
+    return CSRGraph(graph_type, indptr, indices, weights, oneway, node_weights, list(labels))
+
+
+def from_tasks(task_ids, predecessors, node_weights=None):
+    # wiersz zadania = lista jego poprzedników
+    index = {task_id: i for i, task_id in enumerate(task_ids)}
+    sources = [index[task_id] for task_id, preds in zip(task_ids, predecessors) for _ in preds]
+    targets = [index[pred] for preds in predecessors for pred in preds]
+    return from_edges("T", task_ids, sources, targets, node_weights=node_weights)
+
+
+def from_graph(graph):
+    if isinstance(graph, CSRGraph):
+        return graph
+    graph_type = getattr(graph, "type", None)
+    if graph_type == "N":
+        index = graph.index
+        sources, targets = [], []
+        for label in graph.nodes:
+            u = index[label]
+            for neighbour, count in graph.adjacency[label].items():
+                v = index[neighbour]
+                if v > u:
+                    sources += [u] * count
+                    targets += [v] * count
+                elif v == u:
+                    sources += [u] * (count // 2)
+                    targets += [u] * (count // 2)
+        return from_edges("N", graph.nodes, sources, targets)
+    if graph_type == "D":
+        index = graph.index
+        sources, targets = [], []
+        for label in graph.nodes:
+            for successor, count in graph.successors[label].items():
+                sources += [index[label]] * count
+                targets += [index[successor]] * count
+        return from_edges("D", graph.nodes, sources, targets)
+
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(graph.edges(data=True))
+    sources = [index[u] for u, _, _ in edges]
+    targets = [index[v] for _, v, _ in edges]
+    weights = [data.get("weight", 1) for _, _, data in edges]
+    if graph.is_directed() and graph.is_multigraph():
+        oneway = [data.get("oneway", True) for _, _, data in edges]
+        return from_edges("WM", nodes, sources, targets, weights, oneway)
+    graph_type = "WD" if graph.is_directed() else "W"
+    return from_edges(graph_type, nodes, sources, targets, weights)
+
+
+def to_graph(graph):
+    from graphs.createGraph import build_graph
+    graph_type = "D" if graph.type == "T" else graph.type
+    weights = None if graph.weights is None else graph.weights.tolist()
+    oneway = None if graph.oneway is None else graph.oneway.tolist()
+    return build_graph(graph_type, graph.nodes, graph.sources().tolist(), graph.indices.tolist(), weights, oneway)
+
+
+def to_networkx(graph):
+    from graphs.createGraph import build_graph
+    graph_type = {"N": "W", "D": "WD", "T": "WD"}.get(graph.type, graph.type)
+    weights = [1] * graph.number_of_edges() if graph.weights is None else graph.weights.tolist()
+    oneway = None if graph.oneway is None else graph.oneway.tolist()
+    return build_graph(graph_type, graph.nodes, graph.sources().tolist(), graph.indices.tolist(), weights, oneway)
+
+
+def task_graph(tasks):
+    if isinstance(tasks, dict):
+        # zadania bez estymacji zapisujemy jako (d, d, d), tak jak traktuje je symulacja
+        estimates = any('estimate' in task for task in tasks.values())
+        return from_tasks(
+            list(tasks),
+            [task['predecessors'] for task in tasks.values()],
+            [task.get('estimate', (task['duration'],) * 3) if estimates else task['duration'] for task in tasks.values()],
+        )
+    return from_tasks([task for task, _ in tasks], [preds for _, preds in tasks])
+
+
+def aligned(size):
+    return -size % 8
+
+
+def save_graph(graph, file_path):
+    labels = [str(label).encode("utf-8") for label in graph.nodes]
+    if any(b"\n" in label for label in labels):
+        raise ValueError("Node labels must not contain newlines")
+    offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+    np.cumsum([len(label) + 1 for label in labels], out=offsets[1:])
+    blob = np.frombuffer(b"\n".join(labels) + b"\n" if labels else b"", dtype=np.uint8)
+
+    node_weights = graph.node_weights
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["type"] = graph.type.encode()
+    header["index_dtype"] = graph.indices.dtype.str.encode()
+    header["weight_dtype"] = b"" if graph.weights is None else graph.weights.dtype.str.encode()
+    header["node_weight_dtype"] = b"" if node_weights is None else node_weights.dtype.str.encode()
+    header["nodes"] = graph.number_of_nodes()
+    header["edges"] = graph.number_of_edges()
+    header["node_weight_columns"] = 0 if node_weights is None else (node_weights.shape[1] if node_weights.ndim > 1 else 1)
+    header["oneway"] = graph.oneway is not None
+    header["label_bytes"] = len(blob)
+
+    sections = [graph.indptr.astype("<i8"), graph.indices, graph.weights, graph.oneway, node_weights, offsets, blob]
+    with open(file_path, "wb") as file:
+        file.write(header.tobytes())
+        for section in sections:
+            if section is None:
+                continue
+            data = np.ascontiguousarray(section).tobytes()
+            file.write(data)
+            file.write(b"\0" * aligned(len(data)))
+
+
+def is_binary(file_path):
+    with open(file_path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def load_graph(file_path, mmap_mode="r"):
+    raw = np.memmap(file_path, dtype=np.uint8, mode=mmap_mode)
+    header = raw[:HEADER.itemsize].view(HEADER)[0]
+    if header["magic"] != MAGIC:
+        raise ValueError(f"{file_path}: not a binary graph file")
+    n, m = int(header["nodes"]), int(header["edges"])
+    offset = HEADER.itemsize
+
+    def section(dtype, count):
+        nonlocal offset
+        dtype = np.dtype(dtype)
+        array = raw[offset:offset + dtype.itemsize * count].view(dtype)
+        offset += dtype.itemsize * count + aligned(dtype.itemsize * count)
+        return array
+
+    indptr = section("<i8", n + 1)
+    indices = section(header["index_dtype"].decode(), m)
+    weights = section(header["weight_dtype"].decode(), m) if header["weight_dtype"] else None
+    oneway = section(np.uint8, m) if header["oneway"] else None
+    node_weights = None
+    if header["node_weight_dtype"]:
+        columns = int(header["node_weight_columns"])
+        node_weights = section(header["node_weight_dtype"].decode(), n * columns)
+        if columns > 1:
+            node_weights = node_weights.reshape(n, columns)
+    offsets = section("<i8", n + 1)
+    blob = section(np.uint8, int(header["label_bytes"]))
+    graph = CSRGraph(header["type"].decode(), indptr, indices, weights, oneway, node_weights, (offsets, blob))
+    graph.file_path = file_path
+    return graph
+
+
+def main():
+    import sys
+    if len(sys.argv) != 4 or sys.argv[1] not in ("graph", "hu", "critical_path"):
+        print("Usage: python -m graphs.csrGraph graph|hu|critical_path <input.txt> <output.bin>")
+        return
+    kind, input_path, output_path = sys.argv[1:]
+
+    if kind == "graph":
+        from graphs.createGraph import read_header, read_edges
+        with open(input_path, "r") as file:
+            graph_type, line_number = read_header(file, input_path)
+            if graph_type == "C":
+                print("Coordinate files are not supported")
+                return
+            labels, sources, targets, weights, oneway = read_edges(file, input_path, graph_type, line_number)
+        graph = from_edges(graph_type, labels, sources, targets, weights, oneway)
+    elif kind == "hu":
+        from hu.main import parse_data
+        graph = task_graph(parse_data(input_path))
+    else:
+        from critical_path.main import parse_data
+        graph = task_graph(parse_data(input_path))
+
+    save_graph(graph, output_path)
+    print(f"Saved {graph.number_of_nodes()} nodes and {graph.number_of_edges()} edges to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
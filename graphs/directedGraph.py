@@ -1,60 +1,92 @@
-import matplotlib.pyplot as plt
-import networkx as nx
 import itertools as it
+from graphs.render import is_headless
 
 
 class DirectedGraph:
     def __init__(self):
         self.type = "D"
-        self.matrix = []
         self.nodes = []
+        self.index = {}
+        self.successors = {}
+        self.predecessors = {}
+        self.out_degrees = {}
+        self.in_degrees = {}
+
+    @property
+    def matrix(self):
+        return self.get_matrix()
 
     def add_node(self, label):
-        self.matrix.append([0 for i in range(len(self.nodes) + 1)])
-        for i in range(len(self.nodes)):
-            self.matrix[i].append(0)
+        if label in self.index:
+            return
+        self.index[label] = len(self.nodes)
+        self.successors[label] = {}
+        self.predecessors[label] = {}
+        self.out_degrees[label] = 0
+        self.in_degrees[label] = 0
         self.nodes.append(label)
 
     def remove_node(self, label):
-        if label in self.nodes:
-            node = self.nodes.index(label)
+        if label in self.index:
+            for successor, count in self.successors.pop(label).items():
+                if successor != label:
+                    del self.predecessors[successor][label]
+                    self.in_degrees[successor] -= count
+            for predecessor, count in self.predecessors.pop(label).items():
+                if predecessor != label:
+                    del self.successors[predecessor][label]
+                    self.out_degrees[predecessor] -= count
+            del self.out_degrees[label]
+            del self.in_degrees[label]
+            node = self.index.pop(label)
             self.nodes.pop(node)
-            self.matrix.pop(node)
-            for i in range(len(self.nodes)):
-                self.matrix[i].pop(node)
+            for i in range(node, len(self.nodes)):
+                self.index[self.nodes[i]] = i
 
     def add_edge(self, label1, label2):
-        if label1 in self.nodes and label2 in self.nodes:
-            node1 = self.nodes.index(label1)
-            node2 = self.nodes.index(label2)
-            self.matrix[node1][node2] += 1
+        if label1 in self.index and label2 in self.index:
+            row = self.successors[label1]
+            row[label2] = row.get(label2, 0) + 1
+            column = self.predecessors[label2]
+            column[label1] = column.get(label1, 0) + 1
+            self.out_degrees[label1] += 1
+            self.in_degrees[label2] += 1
+
+    def add_edges(self, edges):
+        for label1, label2 in edges:
+            self.add_edge(label1, label2)
 
     def remove_edge(self, label1, label2):
-        if label1 in self.nodes and label2 in self.nodes:
-            node1 = self.nodes.index(label1)
-            node2 = self.nodes.index(label2)
-            if self.matrix[node1][node2] > 0:
-                self.matrix[node1][node2] -= 1
+        if label1 in self.index and label2 in self.index:
+            if self.successors[label1].get(label2, 0) > 0:
+                self.successors[label1][label2] -= 1
+                self.predecessors[label2][label1] -= 1
+                self.out_degrees[label1] -= 1
+                self.in_degrees[label2] -= 1
+                if self.successors[label1][label2] == 0:
+                    del self.successors[label1][label2]
+                    del self.predecessors[label2][label1]
 
     def get_out_degree(self, label):
-        if label in self.nodes:
-            node = self.nodes.index(label)
-            return sum(self.matrix[node])
+        if label in self.index:
+            return self.out_degrees[label]
 
     def get_in_degree(self, label):
-        if label in self.nodes:
-            node = self.nodes.index(label)
-            return sum([row[node] for row in self.matrix])
+        if label in self.index:
+            return self.in_degrees[label]
 
     def plot_graph(self):
+        if is_headless():
+            return
+        import matplotlib.pyplot as plt
+        import networkx as nx
         plot = nx.MultiDiGraph()
-        for i in range(len(self.nodes)):
-            plot.add_node(self.nodes[i])
-        for i in range(len(self.nodes)):
-            for j in range(len(self.nodes)):
-                if self.matrix[i][j] > 0:
-                    for k in range(self.matrix[i][j]):
-                        plot.add_edge(self.nodes[i], self.nodes[j])
+        for label in self.nodes:
+            plot.add_node(label)
+        for label in self.nodes:
+            for successor, count in self.successors[label].items():
+                for k in range(count):
+                    plot.add_edge(label, successor)
         connectionstyle = [f"arc3,rad={r}" for r in it.accumulate([0.15] * 4)]
         pos = nx.shell_layout(plot)
         nx.draw_networkx_nodes(plot, pos)
@@ -65,4 +97,9 @@ class DirectedGraph:
         plt.show()
 
     def get_matrix(self):
-        return self.matrix
+        matrix = [[0] * len(self.nodes) for _ in self.nodes]
+        for label, successors in self.successors.items():
+            row = matrix[self.index[label]]
+            for successor, count in successors.items():
+                row[self.index[successor]] = count
+        return matrix
@@ -1,75 +1,155 @@
-import matplotlib.pyplot as plt
-import networkx as nx
 import itertools as it
+from graphs.render import is_headless
+import heapq
+from collections import Counter
 
 
 class Graph:
     def __init__(self):
         self.type = "N"
-        self.matrix = []
         self.nodes = []
+        self.index = {}
+        self.adjacency = {}
+        self.degrees = {}
+        self.degree_sum = 0
+        self.odd_count = 0
+        self.degree_counts = {}
+        self.min_degrees = []
+        self.max_degrees = []
+
+    @property
+    def matrix(self):
+        return self.get_matrix()
 
     def add_node(self, label):
-        self.matrix.append([0 for i in range(len(self.nodes) + 1)])
-        for i in range(len(self.nodes)):
-            self.matrix[i].append(0)
+        if label in self.index:
+            return
+        self.index[label] = len(self.nodes)
+        self.adjacency[label] = {}
         self.nodes.append(label)
+        self.degrees[label] = 0
+        self.count_degree(0, 1)
 
     def remove_node(self, label):
-        if label in self.nodes:
-            node = self.nodes.index(label)
-            self.nodes.pop(node)
-            self.matrix.pop(node)
-            for i in range(len(self.nodes)):
-                self.matrix[i].pop(node)
+        self.remove_nodes([label])
+
+    def remove_nodes(self, labels):
+        removed = set()
+        for label in labels:
+            if label in self.index and label not in removed:
+                for neighbour, count in self.adjacency.pop(label).items():
+                    if neighbour != label:
+                        del self.adjacency[neighbour][label]
+                        self.set_degree(neighbour, self.degrees[neighbour] - count)
+                self.set_degree(label, 0)
+                self.count_degree(self.degrees.pop(label), -1)
+                removed.add(label)
+        if removed:
+            start = min(self.index.pop(label) for label in removed)
+            self.nodes[start:] = [label for label in self.nodes[start:] if label not in removed]
+            for i in range(start, len(self.nodes)):
+                self.index[self.nodes[i]] = i
 
     def add_edge(self, label1, label2):
-        if label1 in self.nodes and label2 in self.nodes:
-            node1 = self.nodes.index(label1)
-            node2 = self.nodes.index(label2)
-            self.matrix[node1][node2] += 1
-            self.matrix[node2][node1] += 1
+        if label1 in self.index and label2 in self.index:
+            row1 = self.adjacency[label1]
+            row1[label2] = row1.get(label2, 0) + 1
+            row2 = self.adjacency[label2]
+            row2[label1] = row2.get(label1, 0) + 1
+            self.set_degree(label1, self.degrees[label1] + 1)
+            self.set_degree(label2, self.degrees[label2] + 1)
+
+    def add_edges(self, edges):
+        adjacency = self.adjacency
+        added = Counter()
+        for label1, label2 in edges:
+            if label1 in adjacency and label2 in adjacency:
+                row1 = adjacency[label1]
+                row1[label2] = row1.get(label2, 0) + 1
+                row2 = adjacency[label2]
+                row2[label1] = row2.get(label1, 0) + 1
+                added[label1] += 1
+                added[label2] += 1
+        for label, count in added.items():
+            self.set_degree(label, self.degrees[label] + count)
 
     def remove_edge(self, label1, label2):
-        if label1 in self.nodes and label2 in self.nodes:
-            node1 = self.nodes.index(label1)
-            node2 = self.nodes.index(label2)
-            if self.matrix[node1][node2] > 0:
-                self.matrix[node1][node2] -= 1
-                self.matrix[node2][node1] -= 1
+        if label1 in self.index and label2 in self.index:
+            if self.adjacency[label1].get(label2, 0) > 0:
+                for u, v in ((label1, label2), (label2, label1)):
+                    self.adjacency[u][v] -= 1
+                    if self.adjacency[u][v] == 0:
+                        del self.adjacency[u][v]
+                    self.set_degree(u, self.degrees[u] - 1)
+
+    def set_degree(self, label, degree):
+        old = self.degrees[label]
+        if old == degree:
+            return
+        self.degrees[label] = degree
+        self.degree_sum += degree - old
+        self.odd_count += degree % 2 - old % 2
+        self.count_degree(old, -1)
+        self.count_degree(degree, 1)
+
+    def count_degree(self, degree, delta):
+        count = self.degree_counts.get(degree, 0) + delta
+        if count == 0:
+            del self.degree_counts[degree]
+        else:
+            self.degree_counts[degree] = count
+            if count == delta:
+                if len(self.min_degrees) > 2 * len(self.degree_counts) + 8:
+                    self.min_degrees = list(self.degree_counts)
+                    self.max_degrees = [-d for d in self.degree_counts]
+                    heapq.heapify(self.min_degrees)
+                    heapq.heapify(self.max_degrees)
+                else:
+                    heapq.heappush(self.min_degrees, degree)
+                    heapq.heappush(self.max_degrees, -degree)
 
     def get_degree(self, label):
-        if label in self.nodes:
-            node = self.nodes.index(label)
-            return sum(self.matrix[node])
+        if label in self.index:
+            return self.degrees[label]
 
     def get_degrees(self):
         degrees = []
-        for i in range(len(self.nodes)):
-            degrees.append(sum(self.matrix[i]))
-        return sorted(degrees, reverse=True)
+        for degree in sorted(self.degree_counts, reverse=True):
+            degrees.extend([degree] * self.degree_counts[degree])
+        return degrees
 
     def get_min_degree(self):
-        return self.get_degrees()[-1]
+        while self.min_degrees[0] not in self.degree_counts:
+            heapq.heappop(self.min_degrees)
+        return self.min_degrees[0]
 
     def get_max_degree(self):
-        return self.get_degrees()[0]
+        while -self.max_degrees[0] not in self.degree_counts:
+            heapq.heappop(self.max_degrees)
+        return -self.max_degrees[0]
 
     def get_even_degrees(self):
-        return sum([1 for degree in self.get_degrees() if degree % 2 == 0])
+        return len(self.nodes) - self.odd_count
 
     def get_odd_degrees(self):
-        return sum([1 for degree in self.get_degrees() if degree % 2 != 0])
+        return self.odd_count
 
     def plot_graph(self):
+        if is_headless():
+            return
+        import matplotlib.pyplot as plt
+        import networkx as nx
         plot = nx.MultiGraph()
-        for i in range(len(self.nodes)):
-            plot.add_node(self.nodes[i])
-        for i in range(len(self.nodes)):
-            for j in range(i, len(self.nodes)):
-                if self.matrix[i][j] > 0:
-                    for k in range(self.matrix[i][j]):
-                        plot.add_edge(self.nodes[i], self.nodes[j])
+        for label in self.nodes:
+            plot.add_node(label)
+        seen = set()
+        for label in self.nodes:
+            seen.add(label)
+            for neighbour, count in self.adjacency[label].items():
+                if neighbour in seen and neighbour != label:
+                    continue
+                for k in range(count):
+                    plot.add_edge(label, neighbour)
         connectionstyle = [f"arc3,rad={r}" for r in it.accumulate([0.15] * 4)]
         pos = nx.shell_layout(plot)
         nx.draw_networkx_nodes(plot, pos)
@@ -80,11 +160,21 @@ class Graph:
         plt.show()
 
     def get_matrix(self):
-        return self.matrix
-
-    def get_edges(self):
-        edges = 0
-        for i in range(len(self.nodes)):
-            edges += sum(self.matrix[i])
+        matrix = [[0] * len(self.nodes) for _ in self.nodes]
+        for label, neighbours in self.adjacency.items():
+            row = matrix[self.index[label]]
+            for neighbour, count in neighbours.items():
+                row[self.index[neighbour]] = count
+        return matrix
+
+    def get_edge_list(self):
+        edges = []
+        for label in self.nodes:
+            node = self.index[label]
+            for neighbour in self.adjacency[label]:
+                if self.index[neighbour] >= node:
+                    edges.append((label, neighbour))
         return edges
 
+    def get_edges(self):
+        return self.degree_sum
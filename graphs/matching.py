@@ -0,0 +1,16 @@
+def greedy_matching(candidates, size=None):
+    matched = set()
+    matching = []
+    for weight, u, v in candidates:
+        if u != v and u not in matched and v not in matched:
+            matched.add(u)
+            matched.add(v)
+            matching.append((u, v))
+            if len(matching) == size:
+                break
+    return matching
+
+
+def matching_report(mode, cost, lower_bound):
+    gap = cost / lower_bound - 1 if lower_bound > 0 else 0.0
+    return {"mode": mode, "cost": cost, "lower_bound": lower_bound, "gap": gap}
@@ -0,0 +1,12 @@
+import os
+
+headless = os.environ.get("HEADLESS", "0") not in ("", "0")
+
+
+def set_headless(value=True):
+    global headless
+    headless = value
+
+
+def is_headless():
+    return headless
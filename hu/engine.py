@@ -0,0 +1,125 @@
+import heapq
+
+
+def build_successors(nodes, edges):
+    index = {node: i for i, node in enumerate(nodes)}
+    successors = [[] for _ in nodes]
+    in_degrees = [0] * len(nodes)
+    for u, v in edges:
+        successors[index[u]].append(index[v])
+        in_degrees[index[v]] += 1
+    return successors, in_degrees
+
+
+def list_schedule(priorities, successors, in_degrees, m):
+    # kolejka gotowych zadań: najwyższy priorytet, potem kolejność wstawienia
+    remaining = list(in_degrees)
+    ready = [(-priorities[v], v) for v in range(len(remaining)) if remaining[v] == 0]
+    heapq.heapify(ready)
+    diagram = []
+    scheduled = 0
+
+    while ready:
+        step = [heapq.heappop(ready)[1] for _ in range(min(m, len(ready)))]
+        for v in step:
+            for w in successors[v]:
+                remaining[w] -= 1
+                if remaining[w] == 0:
+                    heapq.heappush(ready, (-priorities[w], w))
+        scheduled += len(step)
+        diagram.append(step)
+
+    if scheduled != len(remaining):
+        raise ValueError("Precedence graph contains a cycle")
+    return diagram
+
+
+def hu_schedule(levels, successors, in_degrees, m):
+    return list_schedule(levels, successors, in_degrees, m)
+
+
+def tree_levels(parent):
+    # poziom = odległość od korzenia wzdłuż tablicy rodziców, None gdy jest cykl
+    levels = [-1] * len(parent)
+    for v in range(len(parent)):
+        path = []
+        while v != -1 and levels[v] == -1:
+            levels[v] = -2
+            path.append(v)
+            v = parent[v]
+        if v != -1 and levels[v] == -2:
+            return None
+        level = -1 if v == -1 else levels[v]
+        for u in reversed(path):
+            level += 1
+            levels[u] = level
+    return levels
+
+
+def classify_tree(n, edges):
+    in_degrees = [0] * n
+    out_degrees = [0] * n
+    predecessor = [-1] * n
+    successor = [-1] * n
+    for u, v in edges:
+        out_degrees[u] += 1
+        in_degrees[v] += 1
+        predecessor[v] = u
+        successor[u] = v
+
+    one_parent = max(in_degrees, default=0) <= 1
+    one_child = max(out_degrees, default=0) <= 1
+    if not (one_parent or one_child):
+        return "invalid", None, None, None
+
+    roots = [v for v in range(n) if in_degrees[v] == 0]
+    leaves = [v for v in range(n) if out_degrees[v] == 0]
+
+    if one_parent and len(roots) == 1:
+        graph_type, special, parent = "out-tree", roots[0], predecessor
+    elif one_child and len(leaves) == 1 and roots:
+        graph_type, special, parent = "in-tree", leaves[0], successor
+    elif one_parent and len(roots) > 1:
+        graph_type, special, parent = "out-forest", roots, predecessor
+    elif one_child and len(leaves) > 1:
+        graph_type, special, parent = "in-forest", leaves, successor
+    else:
+        return "invalid", None, None, None
+
+    levels = tree_levels(parent)
+    if levels is None:
+        return "invalid", None, None, None
+    return graph_type, special, parent, levels
+
+
+def timed_list_schedule(priorities, durations, successors, in_degrees, m):
+    remaining = list(in_degrees)
+    ready = [(-priorities[v], v) for v in range(len(remaining)) if remaining[v] == 0]
+    heapq.heapify(ready)
+    free = list(range(m))
+    running = []
+    start = [None] * len(remaining)
+    machine = [None] * len(remaining)
+    time = 0
+    scheduled = 0
+
+    while ready or running:
+        while ready and free:
+            _, v = heapq.heappop(ready)
+            start[v] = time
+            machine[v] = heapq.heappop(free)
+            heapq.heappush(running, (time + durations[v], v))
+        # zwalniamy wszystkie maszyny kończące pracę w tej samej chwili
+        time = running[0][0]
+        while running and running[0][0] == time:
+            _, v = heapq.heappop(running)
+            heapq.heappush(free, machine[v])
+            scheduled += 1
+            for w in successors[v]:
+                remaining[w] -= 1
+                if remaining[w] == 0:
+                    heapq.heappush(ready, (-priorities[w], w))
+
+    if scheduled != len(remaining):
+        raise ValueError("Precedence graph contains a cycle")
+    return start, machine, time
@@ -0,0 +1,127 @@
+import heapq
+from graphs.render import is_headless
+from graphs.csrGraph import CSRGraph
+from hu.engine import build_successors, list_schedule, timed_list_schedule
+
+
+def build_dag(tasks):
+    if isinstance(tasks, CSRGraph):
+        # wiersz grafu zadań = poprzednicy, następników daje transpozycja
+        successors = tasks.transpose()
+        indptr, indices = successors.indptr.tolist(), successors.indices.tolist()
+        successors = [indices[indptr[v]:indptr[v + 1]] for v in range(tasks.number_of_nodes())]
+        return tasks.nodes, successors, tasks.out_degrees().tolist()
+    nodes = [task_id for task_id, _ in tasks]
+    edges = [(pred, task_id) for task_id, preds in tasks for pred in preds]
+    successors, in_degrees = build_successors(nodes, edges)
+    return nodes, successors, in_degrees
+
+
+def topological_order(successors, in_degrees):
+    remaining = list(in_degrees)
+    order = [v for v in range(len(remaining)) if remaining[v] == 0]
+    for v in order:
+        for w in successors[v]:
+            remaining[w] -= 1
+            if remaining[w] == 0:
+                order.append(w)
+    if len(order) != len(remaining):
+        raise ValueError("Precedence graph contains a cycle")
+    return order
+
+
+def highest_levels(successors, in_degrees, durations=None):
+    # poziom = najdłuższa ścieżka od zadania do ujścia (łącznie z nim)
+    levels = [0] * len(successors)
+    for v in reversed(topological_order(successors, in_degrees)):
+        duration = 1 if durations is None else durations[v]
+        levels[v] = duration + max((levels[w] for w in successors[v]), default=0)
+    return levels
+
+
+def coffman_graham_labels(successors, in_degrees):
+    n = len(successors)
+    predecessors = [[] for _ in range(n)]
+    for v in range(n):
+        for w in successors[v]:
+            predecessors[w].append(v)
+
+    unlabelled = [len(successors[v]) for v in range(n)]
+    successor_labels = [[] for _ in range(n)]
+    candidates = [((), v) for v in range(n) if unlabelled[v] == 0]
+    heapq.heapify(candidates)
+    labels = [0] * n
+    label = 0
+
+    while candidates:
+        _, v = heapq.heappop(candidates)
+        label += 1
+        labels[v] = label
+        for u in predecessors[v]:
+            # etykiety rosną, więc lista następników jest od razu malejąca po odwróceniu
+            successor_labels[u].append(label)
+            unlabelled[u] -= 1
+            if unlabelled[u] == 0:
+                heapq.heappush(candidates, (tuple(reversed(successor_labels[u])), u))
+
+    if label != n:
+        raise ValueError("Precedence graph contains a cycle")
+    return labels
+
+
+def task_priorities(successors, in_degrees, rule, durations=None):
+    if rule == "coffman-graham":
+        return coffman_graham_labels(successors, in_degrees)
+    elif rule == "hlf":
+        return highest_levels(successors, in_degrees)
+    elif rule == "critical-path":
+        return highest_levels(successors, in_degrees, durations)
+    raise ValueError(f"Unknown priority rule: {rule}")
+
+
+def schedule_tasks(tasks, m, rule="hlf"):
+    nodes, successors, in_degrees = build_dag(tasks)
+    priorities = task_priorities(successors, in_degrees, rule)
+    diagram = list_schedule(priorities, successors, in_degrees, m)
+    return [[nodes[v] for v in step] for step in diagram], dict(zip(nodes, priorities))
+
+
+def schedule_timed_tasks(tasks, m, durations, rule="critical-path"):
+    nodes, successors, in_degrees = build_dag(tasks)
+    durations = [durations[node] for node in nodes]
+    priorities = task_priorities(successors, in_degrees, rule, durations)
+    start, machine, makespan = timed_list_schedule(priorities, durations, successors, in_degrees, m)
+    schedule = {
+        node: (machine[v], start[v], start[v] + durations[v])
+        for v, node in enumerate(nodes)
+    }
+    return schedule, makespan
+
+
+def print_diagram(diagram, priorities):
+    for t, step in enumerate(diagram):
+        print(f"Time: {t}")
+        for task in step:
+            print(f"Task {task} started, priority: {priorities[task]}")
+
+
+def main():
+    from hu.main import parse_data, create_gantt_chart
+    data = input("Enter the file path: ")
+    m = int(input("Enter the number of machines: "))
+    rule = input("Enter the priority rule (coffman-graham/hlf/critical-path): ").strip() or "hlf"
+    tasks = parse_data(data)
+
+    if rule == "coffman-graham" and m != 2:
+        print("Warning: Coffman-Graham is optimal only for 2 machines")
+
+    diagram, priorities = schedule_tasks(tasks, m, rule)
+    print_diagram(diagram, priorities)
+    print(f"Makespan: {len(diagram)}")
+
+    if not is_headless():
+        create_gantt_chart(diagram, m)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,19 @@
-import networkx as nx
-import matplotlib.pyplot as plt
 import itertools as it
+from graphs.render import is_headless
+from hu.engine import build_successors, classify_tree, hu_schedule, tree_levels
 
 
 def identify_graph_type(graph):
-    in_degrees = dict(graph.in_degree())
-    out_degrees = dict(graph.out_degree())
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = ((index[u], index[v]) for u, v in graph.edges())
+    graph_type, special, _, _ = classify_tree(len(nodes), edges)
 
-    roots = [node for node, deg in in_degrees.items() if deg == 0]
-    leaves = [node for node, deg in out_degrees.items() if deg == 0]
-
-    one_parent = all(deg == 1 for node, deg in in_degrees.items() if node not in roots)
-    one_child = all(deg == 1 for node, deg in out_degrees.items() if node not in leaves)
-
-    if not nx.is_directed_acyclic_graph(graph):
-        return "invalid", None
-
-    if len(roots) == 1 and len(leaves) >= 1 and one_parent:
-        return "out-tree", roots[0]
-    elif len(leaves) == 1 and len(roots) >= 1 and one_child:
-        return "in-tree", leaves[0]
-    elif len(roots) > 1 and one_parent:
-        return "out-forest", roots
-    elif len(leaves) > 1 and one_child:
-        return "in-forest", leaves
-    else:
+    if graph_type == "invalid":
         return "invalid", None
+    if isinstance(special, list):
+        return graph_type, [nodes[v] for v in special]
+    return graph_type, nodes[special]
 
 
 def add_super_root(graph, roots):
@@ -41,6 +29,7 @@ def flip_graph(graph):
 
 
 def build_network(tasks):
+    import networkx as nx
     g = nx.DiGraph()
     for (task_id, pred) in tasks:
         g.add_node(task_id)
@@ -52,6 +41,10 @@ def build_network(tasks):
 
 
 def visualize_network(graph):
+    if is_headless():
+        return
+    import matplotlib.pyplot as plt
+    import networkx as nx
     plt.figure(figsize=(14, 10))
     connectionstyle = [f"arc3,rad={r}" for r in it.accumulate([0.15] * 4)]
     pos = nx.nx_agraph.graphviz_layout(graph, prog='dot')
@@ -82,6 +75,9 @@ def visualize_network(graph):
 
 
 def create_gantt_chart(time_slots, m, mirror=False, ignore_node=None):
+    if is_headless():
+        return
+    import matplotlib.pyplot as plt
     task_times = {}
     for time_idx, tasks in enumerate(time_slots):
         for task in tasks:
@@ -130,25 +126,31 @@ def create_gantt_chart(time_slots, m, mirror=False, ignore_node=None):
     plt.close()
 
 
-def label_tree_levels(graph, root=None):
-    nodes = graph.nodes()
-    roots = [node for node, out_degree in graph.out_degree() if out_degree == 0]
-
-    if root is not None:
-        roots = [root]
+def label_tree_levels(graph):
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    parent = [-1] * len(nodes)
+    for u, v in graph.edges():
+        parent[index[u]] = index[v]
 
-    layers = list(nx.bfs_layers(graph.to_undirected(), roots))
+    for node, level in zip(nodes, tree_levels(parent)):
+        graph.nodes[node]['level'] = level
 
-    for i in range(len(layers)):
-        for node in layers[i]:
-            graph.nodes[node]['level'] = i
+    return graph
 
-    print(layers)
 
-    return graph
+def tasks_from_csr(graph):
+    nodes = graph.nodes
+    return [(task, [nodes[j] for j in graph.neighbours(i).tolist()]) for i, task in enumerate(nodes)]
 
 
 def parse_data(file_path):
+    from graphs.csrGraph import is_binary, load_graph
+    if is_binary(file_path):
+        graph = load_graph(file_path)
+        if graph.type != "T":
+            raise ValueError(f"{file_path}: expected a task graph, got type {graph.type}")
+        return tasks_from_csr(graph)
     tasks = []
     with open(file_path, 'r') as file:
         data = file.readlines()
@@ -162,43 +164,32 @@ def parse_data(file_path):
 
 
 def hu_algorithm(graph, m):
-    t = 0
-    diagram = []
+    nodes = list(graph.nodes)
+    levels = [graph.nodes[node]['level'] for node in nodes]
+    successors, in_degrees = build_successors(nodes, graph.edges())
 
-    while graph.nodes:
-        busy = 0
-        if not (len(graph.nodes) == 1 and "super_root" in graph.nodes):
+    diagram = []
+    remaining = len(nodes)
+    for t, step in enumerate(hu_schedule(levels, successors, in_degrees, m)):
+        if not (remaining == 1 and nodes[step[0]] == "super_root"):
             print(f"Time: {t}")
-        to_remove = []
-        sorted_nodes = sorted(graph.nodes(data=True),
-                              key=lambda x: x[1]['level'],
-                              reverse=True)
-
-        for task in sorted_nodes:
-            if graph.in_degree(task[0]) == 0 and busy < m:
-                busy += 1
-                if task[0] != "super_root":
-                    print(f"Task {task[0]} started, level: {task[1]['level']}")
-                to_remove.append(task)
-
         temp = []
-        for task in to_remove:
-            temp.append(task[0])
-            graph.remove_node(task[0])
+        for v in step:
+            if nodes[v] != "super_root":
+                print(f"Task {nodes[v]} started, level: {levels[v]}")
+            temp.append(nodes[v])
         diagram.append(temp)
+        remaining -= len(step)
 
-        if graph.nodes:
-            visualize_network(graph)
-
-        t += 1
+        if not is_headless():
+            graph.remove_nodes_from(temp)
+            if graph.nodes:
+                visualize_network(graph)
 
     return diagram
 
 
-def main():
-    data = input("Enter the file path: ")
-    m = int(input("Enter the number of machines: "))
-    tasks = parse_data(data)
+def run_hu(tasks, m):
     original_graph = build_network(tasks)
 
     visualize_network(original_graph)
@@ -206,8 +197,7 @@ def main():
     graph_type, special_node = identify_graph_type(original_graph)
 
     if graph_type == "invalid":
-        print("Error: Input graph must be an in-tree, out-tree, in-forest, or out-forest")
-        return
+        return graph_type, None, False, None
 
     print(f"Detected graph type: {graph_type}")
 
@@ -225,15 +215,26 @@ def main():
         ignore_super_root = add_super_root(working_graph, special_node)
         mirror_gantt = True
 
-    if ignore_super_root:
-        working_graph = label_tree_levels(working_graph, "super_root")
-    else:
-        working_graph = label_tree_levels(working_graph)
+    working_graph = label_tree_levels(working_graph)
 
     visualize_network(working_graph)
 
     diagram = hu_algorithm(working_graph, m)
 
+    return graph_type, diagram, mirror_gantt, ignore_super_root
+
+
+def main():
+    data = input("Enter the file path: ")
+    m = int(input("Enter the number of machines: "))
+    tasks = parse_data(data)
+
+    graph_type, diagram, mirror_gantt, ignore_super_root = run_hu(tasks, m)
+
+    if graph_type == "invalid":
+        print("Error: Input graph must be an in-tree, out-tree, in-forest, or out-forest")
+        return
+
     create_gantt_chart(diagram, m, mirror=mirror_gantt, ignore_node=ignore_super_root)
 
 
@@ -1,15 +1,16 @@
-import networkx as nx
-
-from chinese_postman.main import chinese_postman
-from graphs import graph, directedGraph, createGraph
+from graphs import graph, directedGraph, createGraph, coordinateGraph
 from vertex_cover.main import vertex_cover
-from christofides.main import christofides
-import matplotlib.pyplot as plt
+from graphs.render import is_headless
 
 weighted = False
+coordinates = False
 
 
 def plot_graph(graph):
+    if is_headless():
+        return
+    import matplotlib.pyplot as plt
+    import networkx as nx
     pos = nx.shell_layout(graph)
     edge_labels = nx.get_edge_attributes(graph, "weight")
 
@@ -42,10 +43,16 @@ def print_menu():
 file_or_input = input("Do you want to read from file or input? (f/i): ")
 if file_or_input == "f":
     file_path = input("Enter file path: ")
-    data = createGraph.create_graph(file_path)
+    try:
+        data = createGraph.create_graph(file_path)
+    except (OSError, createGraph.GraphFileError) as error:
+        print(error)
+        exit()
     graph = data[0]
     weighted = data[1]
-    if not weighted:
+    # pliki C to same współrzędne: bez edycji krawędzi i węzłów
+    coordinates = isinstance(graph, coordinateGraph.CoordinateGraph)
+    if not weighted or coordinates:
         graph.plot_graph()
 elif file_or_input == "i":
     while True:
@@ -58,6 +65,7 @@ elif file_or_input == "i":
             break
         elif graph_type == "W":
             weighted = True
+            import networkx as nx
             graph = nx.Graph()
             break
         else:
@@ -93,21 +101,21 @@ else:
 while True:
     print_menu()
     choice = input("Enter your choice: ")
-    if choice == "1":
+    if choice == "1" and not coordinates:
         label = input("Enter node label: ")
         graph.add_node(label)
         if weighted:
             plot_graph(graph)
         else:
             graph.plot_graph()
-    elif choice == "2":
+    elif choice == "2" and not coordinates:
         label = input("Enter node label: ")
         graph.remove_node(label)
         if weighted:
             plot_graph(graph)
         else:
             graph.plot_graph()
-    elif choice == "3":
+    elif choice == "3" and not coordinates:
         node1 = input("Enter first node label: ")
         node2 = input("Enter second node label: ")
         if weighted:
@@ -117,7 +125,7 @@ while True:
         else:
             graph.add_edge(node1, node2)
             graph.plot_graph()
-    elif choice == "4":
+    elif choice == "4" and not coordinates:
         node1 = input("Enter first node label: ")
         node2 = input("Enter second node label: ")
         graph.remove_edge(node1, node2)
@@ -147,18 +155,20 @@ while True:
     elif choice == "13" and graph.type == "N":
         cover = vertex_cover(graph)
         print("Cover:", cover)
-    elif choice == "14" and weighted:
+    elif choice == "14" and weighted and not coordinates:
+        from chinese_postman.main import chinese_postman
         source = input("Enter source node: ")
         weight, path = chinese_postman(graph, source)
         print("Path:", path)
         print("Weight:", weight)
     elif choice == "15" and weighted:
+        from christofides.main import christofides
         source = input("Enter source node: ")
         weight, path = christofides(graph, source)
         print("Path:", path)
         if weight:
             print("Weight:", weight)
-    elif choice == "16" and not weighted:
+    elif choice == "16" and (not weighted or coordinates):
         graph.plot_graph()
     elif choice == "17":
         break
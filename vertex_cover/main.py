@@ -1,35 +1,34 @@
 import random
 
-
-def vertex_cover(graph):
-    cover = []
-    counter = 1
-    while graph.get_edges() != 0:
-        nodes = len(graph.nodes)
-        edge = 0
-        node1 = 0
-        node2 = 0
-        while edge == 0:
-            node1 = random.randint(0, nodes - 1)
-            node2 = random.randint(0, nodes - 1)
-            while node1 == node2:
-                node2 = random.randint(0, nodes - 1)
-            edge = graph.get_matrix()[node1][node2]
-        print("Edge", counter, ":", graph.nodes[node1], graph.nodes[node2])
-        cover.append(graph.nodes[node1])
-        cover.append(graph.nodes[node2])
-        if node1 > node2:
-            graph.remove_node(graph.nodes[node1])
-            graph.remove_node(graph.nodes[node2])
-        else:
-            graph.remove_node(graph.nodes[node2])
-            graph.remove_node(graph.nodes[node1])
-        counter += 1
-        graph.plot_graph()
-    return cover
-
-
+from graphs.render import is_headless
 
 
+def maximal_matching(graph, randomized=False, seed=None):
+    edges = graph.get_edge_list()
+    if randomized:
+        random.Random(seed).shuffle(edges)
+    matched = set()
+    matching = []
+    for node1, node2 in edges:
+        if node1 not in matched and node2 not in matched:
+            matched.add(node1)
+            matched.add(node2)
+            matching.append((node1, node2))
+    return matching
 
 
+def vertex_cover(graph, randomized=False, seed=None):
+    cover = []
+    matching = maximal_matching(graph, randomized, seed)
+    # CSRGraph jest tylko do odczytu, więc nie usuwamy z niego wierzchołków
+    mutable = hasattr(graph, "remove_nodes")
+    for counter, (node1, node2) in enumerate(matching, 1):
+        print("Edge", counter, ":", node1, node2)
+        step = [node1] if node1 == node2 else [node1, node2]
+        cover.extend(step)
+        if mutable and not is_headless():
+            graph.remove_nodes(step)
+            graph.plot_graph()
+    if mutable:
+        graph.remove_nodes(cover)
+    return cover